@@ -1,110 +1,68 @@
 import sys
-import re
-import tkinter as tk
-from queue import PriorityQueue
 from time import sleep
-import itertools
-
-# Global counter for nodes insertion order
-insertion_counter = itertools.count()
-visited_nodes = 0 
-
-# Function to read the input file
-def read_input_file(file_path):
-    try:
-        with open(file_path, 'r') as file:
-            content = file.readlines()
-        content = [line.split('//')[0].strip() for line in content if line.strip() and not line.strip().startswith('//')]
-        return content
-    except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
-        sys.exit(1)
-
-# Function to extract grid dimensions
-def extract_grid_dimensions(line):
-    numbers = re.findall(r'\d+', line)
-    if len(numbers) >= 2:
-        return int(numbers[0]), int(numbers[1])
-    else:
-        print("Error: The first line should contain at least two numbers.")
-        sys.exit(1)
-
-# Function to create an empty grid
-def create_empty_grid(num_rows, num_cols, initial_state, goal_states):
-    grid = [['-' for _ in range(num_cols)] for _ in range(num_rows)]
-    grid[initial_state[1]][initial_state[0]] = 'R'
-    for goal in goal_states:
-        grid[goal[1]][goal[0]] = 'G'
-    return grid
-
-# Function to place blocks on the grid
-def place_blocks(grid, blocks):
-    for block in blocks:
-        x, y, w, h = block
-        for i in range(h):
-            for j in range(w):
-                if 0 <= y+i < len(grid) and 0 <= x+j < len(grid[0]):
-                    grid[y+i][x+j] = 'X'
-
-# Function to calculate the Manhattan distance
-def manhattan_distance(start, goal):
-    return abs(start[0] - goal[0]) + abs(start[1] - goal[1])
+from grid_map import read_map_file
+from open_list import OpenList
+from bucket_queue import BucketQueue
+from goal_index import GoalIndex
+from components import reachable_goals
+from search_trace import TraceWriter, split_trace_option
+from search_stats import SearchStats, split_stats_option
+from distance_field import distance_field_cache
+from jump_point import jump_point_search
+from hierarchical import hierarchy_cache
+from grid_canvas import GridCanvas, BASE
 
 # GUI elements
 window = None
-grid_frame = None
+view = None  # GridCanvas while the GUI is shown
+
+# Cell colors, highest priority first; BASE is the map's walls, start and goals
+GUI_LAYERS = [('path', 'yellow'), ('current', 'blue'), BASE, ('open', 'orange')]
 
 # Function to update the GUI
 def update_gui(grid, current, open_set, path=[]):
-    global grid_frame
-    if grid_frame is None:
+    if view is None:
         return
+    view.set_layer('path', path)
+    view.set_layer('current', [current] if current is not None else [])
+    view.set_layer('open', open_set)
+    view.render(force=bool(path))  # The final path is always drawn
 
-    # Destroy all existing widgets in the grid frame
-    for widget in grid_frame.winfo_children():
-        widget.destroy()
-
-    cell_size = 70
-    for y in range(len(grid)):
-        for x in range(len(grid[0])):
-            color = 'white'
-            # Set the color of the cell based on its state
-            if (x, y) in path:
-                color = 'yellow'  # Highlight path in yellow
-            elif grid[y][x] == 'X':
-                color = 'black'  # Blocks are black
-            elif grid[y][x] == 'R' or (x, y) == current:
-                color = 'blue'  # The robot's position is blue
-            elif grid[y][x] == 'G':
-                color = 'green'  # Goal states are green
-            elif (x, y) in [item[2] for item in open_set.queue]:
-                color = 'orange'  # Cells in the open set are orange
-
-            # Create a new cell in the grid frame
-            cell = tk.Frame(grid_frame, width=cell_size, height=cell_size, bg=color, borderwidth=1, relief="solid")
-            cell.grid(row=y, column=x)
-
-    # Update the window to reflect the changes
-    window.update()
-
-# Function to perform the A* search
 # Function to perform the A* search
-def a_star_search(grid, start, goal_states):
-    global visited_nodes  # Add this line to declare visited_nodes as global
-    open_set = PriorityQueue()
-    open_set.put((0, next(insertion_counter), start))
+# The heuristic defaults to the Manhattan distance to the nearest goal; pass DistanceField.heuristic for a perfect one
+def a_star_search(grid, start, goal_states, trace=None, heuristic=None, stats=None):
+    stats = stats if stats is not None else SearchStats('astar')
+    goal_states = reachable_goals(grid, start, goal_states)  # Goals walled off from the start are dropped
+    if not goal_states:
+        return False, [], []
+    goals = GoalIndex(grid, goal_states)  # Goal bitmap and nearest-goal distance lookup
+    if heuristic is None:
+        heuristic = goals.nearest_distance
+    open_set = OpenList()
+    open_set.push(start, 0)
+    stats.pushes += 1
+    if trace:
+        trace.push(start)
     came_from = {}
     g_score = {start: 0}
-    f_score = {start: manhattan_distance(start, goal_states[0])}
+    f_score = {start: heuristic(start)}
 
     # Continue until there are no more cells to visit
-    while not open_set.empty():
-        _, _, current = open_set.get()
-        visited_nodes += 1
+    while open_set:
+        stats.open_size(len(open_set))
+        current = open_set.pop()
+        stats.pops += 1
+        stats.expansions += 1
+        if trace:
+            trace.expand(current)
 
         # If the current cell is a goal state, the path has been found
-        if current in goal_states:
-            path, directions = reconstruct_path(came_from, start, current)
+        if current in goals:
+            stats.closed_size(len(g_score))
+            with stats.phase('reconstruct'):
+                path, directions = reconstruct_path(came_from, start, current)
+            if trace:
+                trace.path_found(path)
             return True, path, directions
 
         # Visit all neighbors of the current cell
@@ -112,25 +70,132 @@ def a_star_search(grid, start, goal_states):
             neighbor = (current[0] + dx, current[1] + dy)
 
             # If the neighbor is within the grid and not a block, consider it
-            if 0 <= neighbor[0] < len(grid[0]) and 0 <= neighbor[1] < len(grid) and grid[neighbor[1]][neighbor[0]] != 'X':
+            if grid.is_free(neighbor[0], neighbor[1]):
+                stats.generations += 1
                 tentative_g_score = g_score[current] + 1
 
                 # If this path to the neighbor is better than any previous one, record it
                 if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                    if neighbor in g_score and neighbor not in open_set:
+                        stats.reexpansions += 1  # Already expanded: reopened with a better g
                     came_from[neighbor] = current
                     g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = tentative_g_score + manhattan_distance(neighbor, goal_states[0])
+                    f_score[neighbor] = tentative_g_score + heuristic(neighbor)
 
-                    # If the neighbor is not in the open set, add it
-                    if neighbor not in [item[2] for item in open_set.queue]:
-                        open_set.put((f_score[neighbor], next(insertion_counter), neighbor))
+                    # Add the neighbor to the open set, or lower its priority if it is already queued
+                    open_set.push(neighbor, f_score[neighbor])
+                    stats.pushes += 1
+                    if trace:
+                        trace.push(neighbor)
 
-        # Update the GUI to reflect the current state of the search
-        update_gui(grid, current, open_set, [])
-        sleep(0.5)
+        # Update the GUI to reflect the current state of the search; headless runs do not wait
+        if view is not None:
+            with stats.phase('render'):
+                update_gui(grid, current, open_set, [])
+            sleep(0.5)
 
     # If the open set is empty and no path has been found, return failure
-    return False, []
+    stats.closed_size(len(g_score))
+    return False, [], []
+
+# Function to perform A* on a map with cell costs. Costs are small integers, so the open list
+# is a bucket queue instead of a heap. The heuristic is the distance to the nearest goal times
+# the cheapest cell cost, which keeps f from ever dropping. Maps without costs use a_star_search.
+def weighted_search(grid, start, goal_states, trace=None, stats=None):
+    stats = stats if stats is not None else SearchStats('weighted')
+    if grid.costs is None:
+        return a_star_search(grid, start, goal_states, trace, stats=stats)
+    goal_states = reachable_goals(grid, start, goal_states)
+    if not goal_states:
+        return False, [], []
+    goals = GoalIndex(grid, goal_states)
+    costs, num_cols = grid.costs, grid.num_cols
+    min_cost, max_cost = grid.cost_range()
+
+    def heuristic(cell):
+        return min_cost * goals.nearest_distance(cell)
+
+    open_set = BucketQueue(max_cost + min_cost)
+    open_set.push(start, heuristic(start))
+    stats.pushes += 1
+    if trace:
+        trace.push(start)
+    came_from = {}
+    g_score = {start: 0}
+    closed = set()
+
+    while open_set:
+        stats.open_size(len(open_set))
+        current = open_set.pop()
+        stats.pops += 1
+        closed.add(current)
+        stats.expansions += 1
+        if trace:
+            trace.expand(current)
+        if current in goals:
+            stats.closed_size(len(closed))
+            with stats.phase('reconstruct'):
+                path, directions = reconstruct_path(came_from, start, current)
+            if trace:
+                trace.path_found(path)
+            return True, path, directions
+
+        for dx, dy in [(0, -1), (-1, 0), (0, 1), (1, 0)]:
+            neighbor = (current[0] + dx, current[1] + dy)
+            if neighbor in closed or not grid.is_free(neighbor[0], neighbor[1]):
+                continue
+            stats.generations += 1
+            tentative_g_score = g_score[current] + costs[neighbor[1] * num_cols + neighbor[0]]
+            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                open_set.push(neighbor, tentative_g_score + heuristic(neighbor))
+                stats.pushes += 1
+                if trace:
+                    trace.push(neighbor)
+
+    stats.closed_size(len(closed))
+    return False, [], []
+
+# Function to answer a query from the cached goal distance field instead of searching.
+# The first query for a map and goal set pays for one reverse BFS, counted in stats as the
+# search's work and timed as 'build'; later starts only walk their path and expand nothing.
+def distance_field_search(grid, start, goal_states, trace=None, stats=None):
+    stats = stats if stats is not None else SearchStats('astar-field')
+    field = distance_field_cache.get(grid, goal_states, stats)
+    with stats.phase('reconstruct'):
+        path = field.path_from(start)
+    if not path:
+        return False, [], []
+    directions = [get_direction(path[i], path[i + 1]) for i in range(len(path) - 1)]
+    if trace:
+        trace.path_found(path)
+    return True, path, directions
+
+# Function to run Jump Point Search and expand its jump points back into unit steps
+def jps_search(grid, start, goal_states, trace=None, stats=None):
+    stats = stats if stats is not None else SearchStats('jps')
+    goal, came_from, _ = jump_point_search(grid, start, goal_states, trace, stats)
+    if goal is None:
+        return False, [], []
+    with stats.phase('reconstruct'):
+        path, directions = reconstruct_path(came_from, start, goal)
+    if trace:
+        trace.path_found(path)
+    return True, path, directions
+
+# Function to answer a query with hierarchical pathfinding (HPA*) over the cached cluster graph.
+# Much faster than A* across large maps, but the path is not always the shortest.
+def hierarchical_search(grid, start, goal_states, trace=None, stats=None):
+    stats = stats if stats is not None else SearchStats('hpa')
+    hierarchy = hierarchy_cache.get(grid)
+    path = hierarchy.find_path(start, goal_states, trace, stats)
+    if not path:
+        return False, [], []
+    directions = [get_direction(path[i], path[i + 1]) for i in range(len(path) - 1)]
+    if trace:
+        trace.path_found(path)
+    return True, path, directions
 
 # Function to get the direction between two nodes
 def get_direction(current, next_node):
@@ -139,9 +204,9 @@ def get_direction(current, next_node):
     dy = next_node[1] - current[1]
     return direction_map.get((dx, dy), 'unknown')
 
-# Function to reconstruct the path and directions including the last step into the goal
+# Function to reconstruct the path and directions from the start up to and including the goal
 def reconstruct_path(came_from, start, goal):
-    path = []
+    path = [goal]
     directions = []
     current = goal
     
@@ -152,26 +217,24 @@ def reconstruct_path(came_from, start, goal):
         current = next_node
         path.append(current)
 
-    path.append(start)  # Optional, if you want to include the starting position in the path
     path.reverse()  # Reverse to get the path from start to goal
     directions.reverse()  # Directions need to be reversed as well
-    
-    # Add the last step which is moving into the goal state
-    if path[-1] != goal:
-        last_step_direction = get_direction(path[-1], goal)
-        directions.append(last_step_direction)
-        path.append(goal)  # Optional, explicitly add the goal position
 
     return path, directions
 
+# Alternatives to plain A* selectable from the command line
+SEARCH_MODES = {'--distance-field': distance_field_search, '--jps': jps_search, '--hierarchical': hierarchical_search,
+                '--weighted': weighted_search}
+# Solver name of each search mode, as used by solvers.py and in the statistics
+SEARCH_NAMES = {'--distance-field': 'astar-field', '--jps': 'jps', '--hierarchical': 'hpa', '--weighted': 'weighted'}
+
 # Main function and entry point
-def main(file_path, use_gui=False):
-    global window, grid_frame
+def main(file_path, use_gui=False, trace_path=None, search_mode=None, show_stats=False):
+    global window, view
     if use_gui:
+        import tkinter as tk
         window = tk.Tk()
         window.title("A* Pathfinding")
-        grid_frame = tk.Frame(window)
-        grid_frame.pack()
 
         def on_window_close():
             global window
@@ -181,14 +244,12 @@ def main(file_path, use_gui=False):
 
         window.protocol("WM_DELETE_WINDOW", on_window_close)
 
-    content = read_input_file(file_path)
-    num_rows, num_cols = extract_grid_dimensions(content[0])
-    initial_state = tuple(map(int, re.findall(r'\d+', content[1])))
-    goal_states = [tuple(map(int, re.findall(r'\d+', x))) for x in content[2].split('|')]
-    blocks = [tuple(map(int, re.findall(r'\d+', x))) for x in content[3:]]
-
-    grid = create_empty_grid(num_rows, num_cols, initial_state, goal_states)
-    place_blocks(grid, blocks)
+    search = SEARCH_MODES.get(search_mode, a_star_search)
+    stats = SearchStats(SEARCH_NAMES.get(search_mode, 'astar'))
+    grid, initial_state, goal_states = read_map_file(file_path, stats)
+    trace = TraceWriter(trace_path, grid) if trace_path else None
+    if use_gui:
+        view = GridCanvas(grid, window, GUI_LAYERS)
 
     def print_grid(grid, path):
         for y in range(len(grid)):
@@ -205,34 +266,38 @@ def main(file_path, use_gui=False):
                     print('.', end=' ')
             print()
 
-    if use_gui:
-        found, path, directions = a_star_search(grid, initial_state, goal_states)  # Corrected to unpack three values
+    with stats.phase('search'):
+        found, path, directions = search(grid, initial_state, goal_states, trace, stats=stats)
+    if trace:
+        trace.close()
+    with stats.phase('render'):
         if found:
-            # Final update to draw the entire path in yellow
-            update_gui(grid, None, PriorityQueue(), path)
+            if use_gui:
+                update_gui(grid, None, OpenList(), path)  # Final update to draw the entire path in yellow
             print_grid(grid, path)
             print("Path found with directions:")
             print(directions)
-            print("Number of nodes visited:", visited_nodes)
+            print("Number of nodes visited:", stats.expansions)
+            if grid.costs is not None:
+                print("Path cost:", grid.path_cost(path))
         else:
             print("Path not found.")
+    if show_stats:
+        print(stats.to_json())
+    if use_gui:
         window.mainloop()
-    else:
-        found, path, directions = a_star_search(grid, initial_state, goal_states)  # Corrected to unpack three values
-        if found:
-            print_grid(grid, path)
-            print("Path found with directions:")
-            print(directions)
-            print("Number of nodes visited:", visited_nodes)
-        else:
-            print("Path not found.")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) not in [2, 3]:
-        print("Usage: python as.py <file_path> [--gui]")
+    trace_path, argv = split_trace_option(sys.argv)
+    show_stats, argv = split_stats_option(argv)
+    search_mode = next((arg for arg in argv if arg in SEARCH_MODES), None)
+    argv = [arg for arg in argv if arg not in SEARCH_MODES]
+    if len(argv) not in [2, 3]:
+        print("Usage: python as.py <file_path> [--gui] [--trace <trace_file>] [--stats] "
+              "[--distance-field | --jps | --hierarchical | --weighted]")
         sys.exit(1)
 
-    use_gui = '--gui' in sys.argv
-    file_path = sys.argv[1] if sys.argv[1] != '--gui' else sys.argv[2]
-    main(file_path, use_gui)
+    use_gui = '--gui' in argv
+    file_path = argv[1] if argv[1] != '--gui' else argv[2]
+    main(file_path, use_gui, trace_path, search_mode, show_stats)
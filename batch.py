@@ -0,0 +1,148 @@
+import sys
+import re
+import json
+import time
+import argparse
+from grid_map import load_map
+from solvers import SOLVERS, solve, prepare_solver, path_directions
+from path_cache import PathCache
+
+# Batch mode: parse and rasterize a map once, then answer a stream of start/goal queries with
+# one JSON result per line. Query lines are either JSON objects such as
+#   {"id": 7, "start": [0, 1], "goals": [[7, 0], [10, 3]], "algorithm": "bfs"}
+# or the map file notation "(0,1) (7,0) | (10,3)" (start first, then goals).
+# A missing start or goal list falls back to the one in the map file.
+
+CELL_PATTERN = re.compile(r'\((\d+)\s*,\s*(\d+)\)')
+
+# Function to parse one query line into (start, goal_states, algorithm, query_id)
+def parse_query(line, default_start, default_goals):
+    if line.startswith('{'):
+        query = json.loads(line)
+        return query.get('start', default_start), query.get('goals', default_goals), query.get('algorithm'), query.get('id')
+    cells = [(int(x), int(y)) for x, y in CELL_PATTERN.findall(line)]
+    if not cells:
+        raise ValueError("expected a start cell like (x,y)")
+    return cells[0], cells[1:] or list(default_goals), None, None
+
+# Function to check that a query cell is an [x, y] pair of integers inside the grid
+def check_cell(grid, cell, what):
+    if (not isinstance(cell, (list, tuple)) or len(cell) != 2
+            or not all(isinstance(value, int) and not isinstance(value, bool) for value in cell)):
+        raise ValueError(f"{what} must be a pair of integers [x, y], got {cell!r}")
+    if not grid.in_bounds(cell[0], cell[1]):
+        raise ValueError(f"{what} {list(cell)} is outside the grid")
+    return tuple(cell)
+
+# Solver options a query may set
+QUERY_OPTIONS = ('depth_limit',)
+
+# Function to check the solver options sent with a query: only QUERY_OPTIONS, and a depth
+# limit that is a non-negative integer (or null for the solver's default)
+def check_options(options):
+    if not isinstance(options, dict):
+        raise ValueError(f"options must be an object, got {options!r}")
+    unknown = sorted(set(options) - set(QUERY_OPTIONS))
+    if unknown:
+        raise ValueError(f"unsupported option(s) {', '.join(map(str, unknown))}; expected one of: {', '.join(QUERY_OPTIONS)}")
+    depth_limit = options.get('depth_limit')
+    if depth_limit is not None and (not isinstance(depth_limit, int) or isinstance(depth_limit, bool) or depth_limit < 0):
+        raise ValueError(f"depth_limit must be a non-negative integer, got {depth_limit!r}")
+    return options
+
+# Function to run one query and describe the result as a JSON-ready dict. With a PathCache the
+# query goes through it, and results it answered without searching are marked with 'cache'.
+# With include_stats the solver's full SearchStats record is added under 'stats'.
+def answer_query(grid, start, goal_states, algorithm, options, include_path=True, cache=None, include_stats=False):
+    try:
+        start = check_cell(grid, start, "start")
+        if not isinstance(goal_states, (list, tuple)):
+            raise ValueError(f"goals must be a list of [x, y] pairs, got {goal_states!r}")
+        goal_states = [check_cell(grid, goal, "goal") for goal in goal_states]
+    except ValueError as error:
+        return {'error': str(error)}
+    if not grid.is_free(start[0], start[1]):
+        return {'error': f"start {list(start)} is blocked"}
+    began = time.perf_counter()
+    if cache is not None:
+        found, path, stats = cache.solve(algorithm, grid, start, goal_states, options)
+    else:
+        found, path, stats = solve(algorithm, grid, start, goal_states, options)
+    elapsed = time.perf_counter() - began
+    result = {
+        'algorithm': algorithm,
+        'found': found,
+        'goal': list(path[-1]) if found else None,
+        'length': len(path) - 1 if found else None,
+        'expansions': stats.expansions,
+        'time_ms': round(elapsed * 1000, 3),
+    }
+    if grid.costs is not None:
+        result['cost'] = grid.path_cost(path) if found else None
+    if cache is not None and cache.last_hit:
+        result['cache'] = cache.last_hit
+    if include_stats:
+        result['stats'] = stats.as_dict()
+    if include_path:
+        result['path'] = [list(cell) for cell in path]
+        result['directions'] = path_directions(path)
+    return result
+
+# Function to answer every query read from queries, writing JSON lines to output
+def run_batch(grid, default_start, default_goals, queries, output, algorithm='astar', options=None,
+              include_path=True, flush_each=False, cache=None, include_stats=False):
+    options = options or {}
+    for line_number, line in enumerate(queries, 1):
+        line = line.split('//')[0].strip()
+        if not line:
+            continue
+        result = {'line': line_number}
+        try:
+            start, goal_states, query_algorithm, query_id = parse_query(line, default_start, default_goals)
+            if query_id is not None:
+                result['id'] = query_id
+            result.update(answer_query(grid, start, goal_states, query_algorithm or algorithm, options,
+                                       include_path, cache, include_stats))
+        except (ValueError, TypeError) as error:
+            result['error'] = str(error)
+        except Exception as error:  # a failing query must not end the batch
+            result['error'] = f"{type(error).__name__}: {error}"
+        output.write(json.dumps(result) + '\n')
+        if flush_each:
+            output.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Answer many start/goal queries against one map.")
+    parser.add_argument('map_file')
+    parser.add_argument('query_file', nargs='?', default='-', help="query lines to read ('-' or omitted for stdin)")
+    parser.add_argument('--algorithm', default='astar', choices=sorted(SOLVERS))
+    parser.add_argument('--output', default='-', help="JSON lines output file ('-' for stdout)")
+    parser.add_argument('--depth-limit', type=int, default=None, help="depth limit for dls (default: rows*cols)")
+    parser.add_argument('--no-path', action='store_true', help="leave path and directions out of the results")
+    parser.add_argument('--stats', action='store_true', help="add each query's search statistics to its result")
+    parser.add_argument('--cache-size', type=int, default=1024, help="cached query results (0 turns the cache off)")
+    args = parser.parse_args(argv)
+
+    try:
+        grid, initial_state, goal_states = load_map(args.map_file)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        sys.exit(1)
+
+    options = {'depth_limit': args.depth_limit}
+    prepare_solver(args.algorithm)
+    cache = PathCache(args.cache_size) if args.cache_size > 0 else None
+    queries = sys.stdin if args.query_file == '-' else open(args.query_file, 'r')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        run_batch(grid, initial_state, goal_states, queries, output, args.algorithm, options,
+                  include_path=not args.no_path, flush_each=queries is sys.stdin, cache=cache,
+                  include_stats=args.stats)
+    finally:
+        if queries is not sys.stdin:
+            queries.close()
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import os
+import re
+import sys
+import glob
+import json
+import time
+import platform
+import argparse
+import statistics
+from multiprocessing import Pool
+from grid_map import load_map
+from solvers import SCRIPT_DIR, SOLVERS, solve, prepare_solver, clear_caches
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Benchmark runner: every solver headless over a set of maps, one task per (map, algorithm)
+# pair in a process pool. Each task runs in a fresh worker process so its peak RSS is its own.
+# Several solvers keep per-map data in shared caches (component indexes, distance fields, HPA*
+# hierarchies), so each task is timed twice: cold, with the caches emptied before every run as
+# for the first query on a map, and warm, with them filled by the runs before.
+
+# Function to list the fixture maps in natural order (input.txt, input1.txt, ..., input10.txt)
+def default_maps():
+    def fixture_number(path):
+        match = re.search(r'(\d+)\.txt$', path)
+        return int(match.group(1)) if match else -1
+    return sorted(glob.glob(os.path.join(SCRIPT_DIR, 'input*.txt')), key=fixture_number)
+
+# Function to get this process's peak resident set size in kilobytes, or None if unknown
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # macOS reports bytes
+
+# Function to benchmark one algorithm on one map; runs inside a pool worker
+def run_task(task):
+    map_file, algorithm, repeat, warmup, options = task
+    result = {'map': os.path.basename(map_file), 'algorithm': algorithm}
+    try:
+        grid, start, goal_states = load_map(map_file)
+        prepare_solver(algorithm)
+        for _ in range(warmup):
+            solve(algorithm, grid, start, goal_states, options)
+        times = []
+        for _ in range(repeat):
+            clear_caches()
+            grid.changed()  # the content hash is cached on the grid too
+            began = time.perf_counter()
+            found, path, stats = solve(algorithm, grid, start, goal_states, options)
+            times.append(time.perf_counter() - began)
+        warm_times = []
+        for _ in range(repeat):
+            began = time.perf_counter()
+            solve(algorithm, grid, start, goal_states, options)
+            warm_times.append(time.perf_counter() - began)
+    except Exception as error:
+        result['error'] = f"{type(error).__name__}: {error}"
+        return result
+
+    median = statistics.median(times)
+    expansions = stats.expansions
+    result.update({
+        'found': found,
+        'length': len(path) - 1 if found else None,
+        'expansions': expansions,
+        'time_ms': round(median * 1000, 4),
+        'min_time_ms': round(min(times) * 1000, 4),
+        'warm_time_ms': round(statistics.median(warm_times) * 1000, 4),
+        'expansions_per_sec': round(expansions / median) if median > 0 else None,
+        'peak_rss_kb': peak_rss_kb(),
+    })
+    return result
+
+# Function to run all (map, algorithm) pairs; results keep the task order
+def run_benchmark(maps, algorithms, repeat=5, warmup=1, workers=None, options=None):
+    tasks = [(map_file, algorithm, repeat, warmup, options or {}) for map_file in maps for algorithm in algorithms]
+    with Pool(processes=workers, maxtasksperchild=1) as pool:
+        return pool.map(run_task, tasks, chunksize=1)
+
+# Function to format a number for the table, with '-' for missing values
+def format_cell(value, fmt='{}'):
+    return '-' if value is None else fmt.format(value)
+
+# Function to print results as an aligned table; baseline adds a time ratio column
+def print_table(results, baseline=None, file=sys.stdout):
+    headers = ['map', 'algorithm', 'found', 'length', 'expansions', 'time ms', 'warm ms', 'exp/s', 'peak RSS MB']
+    if baseline is not None:
+        headers.append('vs base')
+    rows = []
+    for result in results:
+        if 'error' in result:
+            rows.append([result['map'], result['algorithm'], 'error: ' + result['error']])
+            continue
+        rss = result['peak_rss_kb']
+        row = [result['map'], result['algorithm'], 'yes' if result['found'] else 'no',
+               format_cell(result['length']), str(result['expansions']),
+               format_cell(result['time_ms'], '{:.3f}'), format_cell(result.get('warm_time_ms'), '{:.3f}'),
+               format_cell(result['expansions_per_sec'], '{:,}'),
+               format_cell(None if rss is None else rss / 1024, '{:.1f}')]
+        if baseline is not None:
+            before = baseline.get((result['map'], result['algorithm']))
+            if before and before.get('time_ms'):
+                row.append(f"{result['time_ms'] / before['time_ms']:.2f}x")
+            else:
+                row.append('-')
+        rows.append(row)
+
+    widths = [len(header) for header in headers]
+    for row in rows:
+        if len(row) == len(headers):
+            widths = [max(width, len(cell)) for width, cell in zip(widths, row)]
+    print('  '.join(header.ljust(width) for header, width in zip(headers, widths)), file=file)
+    print('  '.join('-' * width for width in widths), file=file)
+    for row in rows:
+        print('  '.join(cell.ljust(width) for cell, width in zip(row, widths)), file=file)
+
+# Function to load a previous JSON report as {(map, algorithm): result}
+def load_baseline(file_path):
+    with open(file_path, 'r') as file:
+        report = json.load(file)
+    return {(result['map'], result['algorithm']): result for result in report['results']}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the solvers over a set of maps.")
+    parser.add_argument('maps', nargs='*', help="map files (default: the input*.txt fixtures)")
+    parser.add_argument('--algorithms', default=','.join(SOLVERS),
+                        help=f"comma separated list (default: {','.join(SOLVERS)})")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="timed cold and warm runs per task; the medians are reported")
+    parser.add_argument('--warmup', type=int, default=1, help="untimed runs per task before timing")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: CPU count; use 1 for the least timing noise)")
+    parser.add_argument('--depth-limit', type=int, default=None, help="depth limit for dls (default: rows*cols)")
+    parser.add_argument('--json', metavar='FILE', help="also write the results as JSON ('-' for stdout)")
+    parser.add_argument('--compare', metavar='FILE', help="earlier --json report to compare times against")
+    args = parser.parse_args(argv)
+
+    algorithms = [name.strip() for name in args.algorithms.split(',') if name.strip()]
+    unknown = [name for name in algorithms if name not in SOLVERS]
+    if unknown:
+        parser.error(f"unknown algorithm(s): {', '.join(unknown)}")
+    if args.repeat < 1 or args.warmup < 0:
+        parser.error("--repeat must be at least 1 and --warmup at least 0")
+    maps = args.maps or default_maps()
+    baseline = None
+    if args.compare:
+        try:
+            baseline = load_baseline(args.compare)
+        except (OSError, ValueError, KeyError) as error:
+            print(f"Error: Could not read baseline '{args.compare}': {error}", file=sys.stderr)
+            sys.exit(1)
+
+    results = run_benchmark(maps, algorithms, args.repeat, args.warmup, args.workers,
+                            {'depth_limit': args.depth_limit})
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'warmup': args.warmup,
+        'results': results,
+    }
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_table(results, baseline)
+        if args.json:
+            with open(args.json, 'w') as file:
+                json.dump(report, file, indent=2)
+
+if __name__ == "__main__":
+    main()
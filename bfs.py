@@ -1,47 +1,17 @@
 import sys
-import re
-import tkinter as tk
 from queue import Queue
 from time import sleep
 import itertools
+from grid_map import read_map_file
+from components import reachable_goals
+from search_trace import TraceWriter, split_trace_option
+from search_stats import SearchStats, split_stats_option
+from grid_canvas import GridCanvas, BASE
 
 # Global counter for nodes insertion order
 insertion_counter = itertools.count()
 open_set_tracker = set()  # Track nodes in the open set globally
 
-def read_input_file(file_path):
-    try:
-        with open(file_path, 'r') as file:
-            content = file.readlines()
-        content = [line.split('//')[0].strip() for line in content if line.strip() and not line.strip().startswith('//')]
-        return content
-    except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
-        sys.exit(1)
-
-def extract_grid_dimensions(line):
-    numbers = re.findall(r'\d+', line)
-    if len(numbers) >= 2:
-        return int(numbers[0]), int(numbers[1])
-    else:
-        print("Error: The first line should contain at least two numbers.")
-        sys.exit(1)
-
-def create_empty_grid(num_rows, num_cols, initial_state, goal_states):
-    grid = [['-' for _ in range(num_cols)] for _ in range(num_rows)]
-    grid[initial_state[1]][initial_state[0]] = 'R'
-    for goal in goal_states:
-        grid[goal[1]][goal[0]] = 'G'
-    return grid
-
-def place_blocks(grid, blocks):
-    for block in blocks:
-        x, y, w, h = block
-        for i in range(h):
-            for j in range(w):
-                if 0 <= y+i < len(grid) and 0 <= x+j < len(grid[0]):
-                    grid[y+i][x+j] = 'X'
-
 def get_direction(current, next_node):
     if current is None or next_node is None:
         return 'unknown'
@@ -51,7 +21,7 @@ def get_direction(current, next_node):
     return direction_map.get((dx, dy), 'unknown')
 
 def reconstruct_path(came_from, start, goal):
-    path = []
+    path = [goal]
     directions = []
     current = goal
 
@@ -68,73 +38,77 @@ def reconstruct_path(came_from, start, goal):
     directions.reverse()
 
     # Ensure the path starts at the initial state
-    if path and path[0] != start:
+    if path[0] != start:
         path.insert(0, start)
 
-    # Ensure the path includes the last direction towards the goal
-    if path[-1] != goal:
-        last_direction = get_direction(path[-1], goal)
-        directions.append(last_direction)
-        path.append(goal)
-
     return path, directions
 
 window = None
-grid_frame = None
+view = None  # GridCanvas while the GUI is shown
+
+# Cell colors, highest priority first; BASE is the map's walls, start and goals
+GUI_LAYERS = [('path', 'yellow'), ('current', 'blue'), BASE, ('open', 'orange')]
 
 def update_gui(grid, current, path=[]):
-    global grid_frame
-    if grid_frame is None:
+    if view is None:
         return
+    view.set_layer('path', path)
+    view.set_layer('current', [current] if current is not None else [])
+    view.set_layer('open', open_set_tracker)
+    view.render(force=bool(path))  # The final path is always drawn
 
-    for widget in grid_frame.winfo_children():
-        widget.destroy()
-
-    cell_size = 70
-    for y in range(len(grid)):
-        for x in range(len(grid[0])):
-            color = 'white'
-            if (x, y) in path:
-                color = 'yellow'
-            elif grid[y][x] == 'X':
-                color = 'black'
-            elif grid[y][x] == 'R' or (x, y) == current:
-                color = 'blue'
-            elif grid[y][x] == 'G':
-                color = 'green'
-            elif (x, y) in open_set_tracker:
-                color = 'orange'
-            cell = tk.Frame(grid_frame, width=cell_size, height=cell_size, bg=color, borderwidth=1, relief="solid")
-            cell.grid(row=y, column=x)
-    window.update()
-
-def bfs_search(grid, start, goal_states):
+def bfs_search(grid, start, goal_states, trace=None, stats=None):
     global open_set_tracker
+    stats = stats if stats is not None else SearchStats('bfs')
+    goal_states = reachable_goals(grid, start, goal_states)  # Goals walled off from the start are dropped
+    if not goal_states:
+        return False, [], [], 0
     open_set = Queue()
     open_set.put(start)
+    stats.pushes += 1
     open_set_tracker = {start}
     came_from = {start: None}
     visited_nodes_count = 0  # Initialize the visited nodes count
+    if trace:
+        trace.push(start)
 
     while not open_set.empty():
+        stats.open_size(len(open_set_tracker))
         current = open_set.get()
+        stats.pops += 1
         open_set_tracker.remove(current)
         visited_nodes_count += 1  # Increment visited nodes count
+        if trace:
+            trace.expand(current)
 
         if current in goal_states:
-            path, directions = reconstruct_path(came_from, start, current)
+            stats.expansions += visited_nodes_count
+            stats.closed_size(len(came_from))
+            with stats.phase('reconstruct'):
+                path, directions = reconstruct_path(came_from, start, current)
+            if trace:
+                trace.path_found(path)
             return True, path, directions, visited_nodes_count  # Include visited node count in the return statement
         
         for dx, dy in [(0, -1), (-1, 0), (0, 1), (1, 0)]:
             neighbor = (current[0] + dx, current[1] + dy)
-            if 0 <= neighbor[0] < len(grid[0]) and 0 <= neighbor[1] < len(grid) and grid[neighbor[1]][neighbor[0]] != 'X' and neighbor not in came_from:
+            if grid.is_free(neighbor[0], neighbor[1]):
+                stats.generations += 1
+                if neighbor in came_from:
+                    continue
                 open_set.put(neighbor)
+                stats.pushes += 1
                 open_set_tracker.add(neighbor)
                 came_from[neighbor] = current
-        if window and grid_frame:
-            update_gui(grid, current, [])
+                if trace:
+                    trace.push(neighbor)
+        if window and view:
+            with stats.phase('render'):
+                update_gui(grid, current, [])
             sleep(0.5)
     
+    stats.expansions += visited_nodes_count
+    stats.closed_size(len(came_from))
     return False, [], [], visited_nodes_count  # Return visited node count if no path is found
 
 def print_grid(grid, path):
@@ -152,13 +126,12 @@ def print_grid(grid, path):
                 print('.', end=' ')
         print()
 
-def main(file_path, use_gui=False):
-    global window, grid_frame
+def main(file_path, use_gui=False, trace_path=None, show_stats=False):
+    global window, view
     if use_gui:
+        import tkinter as tk
         window = tk.Tk()
         window.title("BFS Pathfinding")
-        grid_frame = tk.Frame(window)
-        grid_frame.pack()
 
         def on_window_close():
             global window
@@ -167,19 +140,20 @@ def main(file_path, use_gui=False):
                 window = None
         window.protocol("WM_DELETE_WINDOW", on_window_close)
 
-    content = read_input_file(file_path)
-    num_rows, num_cols = extract_grid_dimensions(content[0])
-    initial_state = tuple(map(int, re.findall(r'\d+', content[1])))
-    goal_states = [tuple(map(int, re.findall(r'\d+', x))) for x in content[2].split('|')]
-    blocks = [tuple(map(int, re.findall(r'\d+', x))) for x in content[3:]]
-
-    grid = create_empty_grid(num_rows, num_cols, initial_state, goal_states)
-    place_blocks(grid, blocks)
-
+    stats = SearchStats('bfs')
+    grid, initial_state, goal_states = read_map_file(file_path, stats)
+    trace = TraceWriter(trace_path, grid) if trace_path else None
     if use_gui:
-        found, path, directions, visited_nodes_count = bfs_search(grid, initial_state, goal_states)
+        view = GridCanvas(grid, window, GUI_LAYERS)
+
+    with stats.phase('search'):
+        found, path, directions, visited_nodes_count = bfs_search(grid, initial_state, goal_states, trace, stats)
+    if trace:
+        trace.close()
+    with stats.phase('render'):
         if found:
-            update_gui(grid, None, path)  # Final update to draw the entire path in yellow
+            if use_gui:
+                update_gui(grid, None, path)  # Final update to draw the entire path in yellow
             print_grid(grid, path)
             print(f"Goal Node: {goal_states[0]}")  # Assume single goal state for this output
             print(f"Number of nodes visited by the path: {visited_nodes_count}")
@@ -187,24 +161,20 @@ def main(file_path, use_gui=False):
             print(' -> '.join(directions))  # Print directions with arrows
         else:
             print("Path not found.")
+            if not use_gui:
+                print(f"Number of nodes visited: {visited_nodes_count}")
+    if show_stats:
+        print(stats.to_json())
+    if use_gui:
         window.mainloop()
-    else:
-        found, path, directions, visited_nodes_count = bfs_search(grid, initial_state, goal_states)
-        if found:
-            print_grid(grid, path)
-            print(f"Goal Node: {goal_states[0]}")  # Assume single goal state for this output
-            print(f"Number of nodes visited by the path: {visited_nodes_count}")
-            print("Path found with directions:")
-            print(' -> '.join(directions))  # Print directions with arrows
-        else:
-            print("Path not found.")
-            print(f"Number of nodes visited: {visited_nodes_count}")
 
 if __name__ == "__main__":
-    if len(sys.argv) not in [2, 3]:
-        print("Usage: python bfs.py <file_path> [--gui]")
+    trace_path, argv = split_trace_option(sys.argv)
+    show_stats, argv = split_stats_option(argv)
+    if len(argv) not in [2, 3]:
+        print("Usage: python bfs.py <file_path> [--gui] [--trace <trace_file>] [--stats]")
         sys.exit(1)
 
-    use_gui = '--gui' in sys.argv
-    file_path = sys.argv[1] if sys.argv[1] != '--gui' else sys.argv[2]
-    main(file_path, use_gui)
+    use_gui = '--gui' in argv
+    file_path = argv[1] if argv[1] != '--gui' else argv[2]
+    main(file_path, use_gui, trace_path, show_stats)
@@ -1,45 +1,8 @@
 import sys
-import re
-import tkinter as tk
-from queue import Queue
 import time
-
-def read_input_file(file_path):
-    # Reads an input file, filtering out comments and blank lines.
-    try:
-        with open(file_path, 'r') as file:
-            content = file.readlines()
-        content = [line.split('//')[0].strip() for line in content if line.strip() and not line.strip().startswith('//')]
-        return content
-    except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
-        sys.exit(1)
-
-def extract_grid_dimensions(line):
-    # Extracts the number of rows and columns for the grid from the first line of the input.
-    numbers = re.findall(r'\d+', line)
-    if len(numbers) >= 2:
-        return int(numbers[0]), int(numbers[1])
-    else:
-        print("Error: The first line should contain at least two numbers.")
-        sys.exit(1)
-
-def create_empty_grid(num_rows, num_cols, initial_state, goal_states):
-    # Creates an empty grid and marks the initial and goal positions.
-    grid = [['-' for _ in range(num_cols)] for _ in range(num_rows)]
-    grid[initial_state[1]][initial_state[0]] = 'R'
-    for goal in goal_states:
-        grid[goal[1]][goal[0]] = 'G'
-    return grid
-
-def place_blocks(grid, blocks):
-    # Places obstacles ('X') on the grid as specified in the input.
-    for block in blocks:
-        x, y, w, h = block
-        for i in range(h):
-            for j in range(w):
-                if 0 <= y+i < len(grid) and 0 <= x+j < len(grid[0]):
-                    grid[y+i][x+j] = 'X'
+from grid_map import read_map_file
+from search_trace import TraceWriter, split_trace_option
+from search_stats import SearchStats, split_stats_option
 
 def print_grid(grid, path=[], nodes_visited=set(), goal_node=None):
     direction_symbols = {(0, -1): 'up', (0, 1): 'down', (-1, 0): 'left', (1, 0): 'right'}
@@ -66,7 +29,7 @@ def get_neighbors(position, grid):
     directions = [(-1, 0), (0, -1), (1, 0), (0, 1)]  # UP, LEFT, DOWN, RIGHT
     for dy, dx in directions:  # Adjusted to reflect priority order
         nx, ny = x + dx, y + dy
-        if 0 <= nx < len(grid[0]) and 0 <= ny < len(grid) and grid[ny][nx] != 'X':
+        if grid.is_free(nx, ny):
             neighbors.append((nx, ny))
     return neighbors
 
@@ -93,6 +56,7 @@ def print_direction_path(path):
 # GUI setup
 def setup_gui(grid):
     global window, canvas
+    import tkinter as tk
     window = tk.Tk()
     window.title("Bidirectional Search Visualization")
     
@@ -146,102 +110,124 @@ def draw_final_path(path, cell_size):
     window.update_idletasks()
     window.update()
 
-def parse_tuple(s):
-    # Extracts numbers from a string and returns them as a tuple of integers
-    return tuple(map(int, re.findall(r'\d+', s)))
-
-def bidirectional_search_unified(grid, start, goal, update_func=None, cell_size=None):
-    queue_start = Queue()
-    queue_goal = Queue()
-
-    queue_start.put((start, [start]))
-    queue_goal.put((goal, [goal]))
-
+# Bidirectional BFS that only keeps parent pointers. Each step expands one whole layer of the
+# side with the smaller frontier, and the backward side starts from every free goal at once.
+# Because whole layers are expanded, the first meeting cell found lies on a shortest path.
+# Returns (found, path, stats); stats counts the expansions of both sides together.
+def bidirectional_search_unified(grid, start, goal_states, update_func=None, cell_size=None, trace=None, stats=None):
+    stats = stats if stats is not None else SearchStats('bs')
     visited_start = {start: None}
-    visited_goal = {goal: None}
-
-    nodes_visited_from_start = set()
-    nodes_visited_from_goal = set()
-
-    while not queue_start.empty() and not queue_goal.empty():
-        if not queue_start.empty():
-            current_start, path_start = queue_start.get()
-            nodes_visited_from_start.add(current_start)
-            if current_start in visited_goal:
-                # Properly merge paths without duplicating the meeting point
-                path_from_start = reconstruct_path(visited_start, current_start)[:-1]  # Exclude last node to avoid duplication
-                path_from_goal = reconstruct_path(visited_goal, current_start)
-                final_path = path_from_start + path_from_goal[::-1]  # Reverse goal path and concatenate
-                return True, final_path, nodes_visited_from_start, nodes_visited_from_goal
-            for neighbor in get_neighbors(current_start, grid):
-                if neighbor not in visited_start:
-                    visited_start[neighbor] = current_start
-                    queue_start.put((neighbor, path_start + [neighbor]))
-                    if update_func:
-                        update_func(path_start, [], cell_size)
-
-        if not queue_goal.empty():
-            current_goal, path_goal = queue_goal.get()
-            nodes_visited_from_goal.add(current_goal)
-            if current_goal in visited_start:
-                final_path = reconstruct_path(visited_start, current_goal) + reconstruct_path(visited_goal, current_goal)[::-1]
-                return True, final_path, nodes_visited_from_start, nodes_visited_from_goal
-            for neighbor in get_neighbors(current_goal, grid):
-                if neighbor not in visited_goal:
-                    visited_goal[neighbor] = current_goal
-                    queue_goal.put((neighbor, path_goal + [neighbor]))
-                    if update_func:
-                        update_func([], path_goal, cell_size)
-
+    visited_goal = {}
+    frontier_start = [start]
+    frontier_goal = []
+    for goal in goal_states:
+        if grid.is_free(goal[0], goal[1]) and goal not in visited_goal:
+            visited_goal[goal] = None
+            frontier_goal.append(goal)
+
+    stats.pushes += len(frontier_start) + len(frontier_goal)
+    if trace:
+        trace.push(start)
+        for goal in frontier_goal:
+            trace.push_backward(goal)
+
+    meeting = start if start in visited_goal else None
+    while meeting is None and frontier_start and frontier_goal:
+        stats.open_size(len(frontier_start) + len(frontier_goal))
+        forward = len(frontier_start) <= len(frontier_goal)
+        if forward:
+            frontier, parents, other_parents = frontier_start, visited_start, visited_goal
+        else:
+            frontier, parents, other_parents = frontier_goal, visited_goal, visited_start
+
+        next_frontier = []
+        for current in frontier:
+            stats.pops += 1
+            stats.expansions += 1
+            if trace:
+                (trace.expand if forward else trace.expand_backward)(current)
+            for neighbor in get_neighbors(current, grid):
+                stats.generations += 1
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = current
+                stats.pushes += 1
+                if trace:
+                    (trace.push if forward else trace.push_backward)(neighbor)
+                if neighbor in other_parents:
+                    meeting = neighbor
+                    break
+                next_frontier.append(neighbor)
+            if meeting is not None:
+                break
+
+        if forward:
+            frontier_start = next_frontier
+        else:
+            frontier_goal = next_frontier
         if update_func:
+            with stats.phase('render'):
+                update_func(frontier if forward else [], [] if forward else frontier, cell_size)
             time.sleep(0.5)
 
-    return False, [], nodes_visited_from_start, nodes_visited_from_goal
+    stats.closed_size(len(visited_start) + len(visited_goal))
+    if meeting is None:
+        return False, [], stats
 
+    # Join start -> meeting with meeting -> goal without repeating the meeting cell
+    with stats.phase('reconstruct'):
+        final_path = reconstruct_path(visited_start, meeting) + reconstruct_path(visited_goal, meeting)[::-1][1:]
+    if trace:
+        trace.path_found(final_path)
+    return True, final_path, stats
 
-def main(file_path, use_gui=False):
-    content = read_input_file(file_path)
-    num_rows, num_cols = extract_grid_dimensions(content[0])
-    initial_state = parse_tuple(content[1])
-    goal_states = [parse_tuple(goal_state) for goal_state in content[2].split('|')]
-    blocks = [parse_tuple(block) for block in content[3:]]
 
-    grid = create_empty_grid(num_rows, num_cols, initial_state, goal_states)
-    place_blocks(grid, blocks)
+def main(file_path, use_gui=False, trace_path=None, show_stats=False):
+    stats = SearchStats('bs')
+    grid, initial_state, goal_states = read_map_file(file_path, stats)
+    trace = TraceWriter(trace_path, grid) if trace_path else None
 
     if use_gui:
         cell_size = setup_gui(grid)
         window.update_idletasks()
 
-    goal_state = goal_states[0] if goal_states else None
-    if goal_state:
-        success, path, nodes_visited_from_start, nodes_visited_from_goal = bidirectional_search_unified(
-            grid, initial_state, goal_state, update_gui if use_gui else None, cell_size if use_gui else None
-        )
-        if success:
-            print("Path found!")
-            print(f"Goal node: {goal_state}")
-            print("Total nodes visited:", len(nodes_visited_from_start | nodes_visited_from_goal))
-            print_direction_path(path)
-            if use_gui:
-                draw_final_path(path, cell_size)
-                window.mainloop()
-        else:
-            print("No path found.")
+    goal_states = [goal_state for goal_state in goal_states if goal_state]
+    if goal_states:
+        with stats.phase('search'):
+            success, path, _ = bidirectional_search_unified(
+                grid, initial_state, goal_states, update_gui if use_gui else None, cell_size if use_gui else None, trace, stats
+            )
+        if trace:
+            trace.close()
+        with stats.phase('render'):
+            if success:
+                print("Path found!")
+                print(f"Goal node: {path[-1]}")
+                print("Total nodes visited:", stats.expansions)
+                print_direction_path(path)
+                if use_gui:
+                    draw_final_path(path, cell_size)
+            else:
+                print("No path found.")
+        if show_stats:
+            print(stats.to_json())
+        if success and use_gui:
+            window.mainloop()
     else:
         print("Error: No goal state provided.")
 
 if __name__ == "__main__":
-    use_gui = '--gui' in sys.argv
+    trace_path, argv = split_trace_option(sys.argv)
+    show_stats, argv = split_stats_option(argv)
+    use_gui = '--gui' in argv
     file_path = None
-    for arg in sys.argv[1:]:
+    for arg in argv[1:]:
         if arg != '--gui':
             file_path = arg
             break
 
     if file_path is None:
-        print("Usage: python script.py <file_path> [--gui]")
+        print("Usage: python script.py <file_path> [--gui] [--trace <trace_file>] [--stats]")
         sys.exit(1)
 
-    main(file_path, use_gui)
-    
\ No newline at end of file
+    main(file_path, use_gui, trace_path, show_stats)
@@ -0,0 +1,58 @@
+# Open list for searches with small integer priorities that never go below the last popped one
+# (Dijkstra, or A* with a consistent heuristic, on integer step costs). If every push is at most
+# max_step above the last popped priority, a ring of max_step + 1 buckets holds all entries and
+# push and pop are O(1) (pop scans at most max_step empty buckets).
+# Pushing a queued item again moves it: the old entry stays in its bucket and is skipped when
+# reached. Within a bucket the most recently pushed item comes out first.
+class BucketQueue:
+    def __init__(self, max_step):
+        self.buckets = [[] for _ in range(max_step + 1)]
+        self.current = None  # priority of the bucket pop() looks at first, set by the first push
+        self.priorities = {}  # queued item -> its current priority
+
+    def __len__(self):
+        return len(self.priorities)
+
+    def __bool__(self):
+        return bool(self.priorities)
+
+    def __contains__(self, item):
+        return item in self.priorities
+
+    def __iter__(self):
+        return iter(self.priorities)
+
+    def empty(self):
+        return not self.priorities
+
+    # Priority currently stored for item (KeyError if it is not queued)
+    def priority(self, item):
+        return self.priorities[item]
+
+    # Insert item, or move it to its new priority if it is already queued
+    def push(self, item, priority):
+        if self.current is None:
+            self.current = priority
+        elif not self.current <= priority < self.current + len(self.buckets):
+            raise ValueError(f"priority {priority} outside the window [{self.current}, "
+                             f"{self.current + len(self.buckets) - 1}] of the bucket queue")
+        self.priorities[item] = priority
+        self.buckets[priority % len(self.buckets)].append((priority, item))
+
+    # Remove and return (item, priority) for the lowest priority entry
+    def pop_with_priority(self):
+        if not self.priorities:
+            raise IndexError("pop from an empty bucket queue")
+        buckets, priorities = self.buckets, self.priorities
+        while True:
+            bucket = buckets[self.current % len(buckets)]
+            while bucket:
+                priority, item = bucket.pop()
+                if priorities.get(item) == priority:
+                    del priorities[item]
+                    return item, priority
+            self.current += 1
+
+    # Remove and return the item with the lowest priority
+    def pop(self):
+        return self.pop_with_priority()[0]
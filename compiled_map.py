@@ -0,0 +1,171 @@
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import argparse
+from array import array
+from grid_map import GridMap, load_text_map
+from distance_field import DistanceField, compute_distance_field, distance_field_cache
+
+# Compiled map: the parsed and rasterized form of a text map, so loading skips the parsing.
+# A fixed header (with the hash of the text file it was compiled from) is followed by the goal
+# cells, a section table and the sections themselves: the grid cells, and optionally the cell
+# costs and the distance field of the map's own goals. Sections start on mmap page boundaries
+# and are mapped copy-on-write, so opening a map costs no copying, processes that open the
+# same file share its pages, and a solver that changes cells only changes its own copy.
+MAGIC = b'GMAP'
+VERSION = 1
+HEADER = struct.Struct('<4sH16sIIIIII')  # magic, version, source hash, num_rows, num_cols, start x, start y, goals, sections
+GOAL = struct.Struct('<II')
+SECTION = struct.Struct('<4sQQ')  # tag, offset, length in bytes
+
+CELLS = b'CELL'
+COSTS = b'COST'
+DISTANCES = b'DIST'  # int32 little-endian, see distance_field.compute_distance_field
+
+SUFFIX = '.gmap'
+
+# Path of the compiled copy written next to a text map
+def compiled_path(file_path):
+    return file_path + SUFFIX
+
+# Function to hash the bytes of a map file; a compiled copy is used only while this matches
+def source_hash(file_path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+def align(offset):
+    return -(-offset // mmap.ALLOCATIONGRANULARITY) * mmap.ALLOCATIONGRANULARITY
+
+# Function to read the header of an open compiled map.
+# Returns (source hash, num_rows, num_cols, initial_state, goal_states, sections).
+def read_header(file):
+    data = file.read(HEADER.size)
+    if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"'{file.name}' is not a compiled map")
+    _, version, source, num_rows, num_cols, x, y, num_goals, num_sections = HEADER.unpack(data)
+    if version != VERSION:
+        raise ValueError(f"'{file.name}' is a version {version} compiled map, expected version {VERSION}")
+    data = file.read(GOAL.size * num_goals + SECTION.size * num_sections)
+    if len(data) < GOAL.size * num_goals + SECTION.size * num_sections:
+        raise ValueError(f"'{file.name}' is truncated")
+    goal_states = [GOAL.unpack_from(data, i * GOAL.size) for i in range(num_goals)]
+    sections = {}
+    for i in range(num_sections):
+        tag, offset, length = SECTION.unpack_from(data, GOAL.size * num_goals + i * SECTION.size)
+        sections[tag] = (offset, length)
+    return source, num_rows, num_cols, (x, y), goal_states, sections
+
+# Function to pick the file load_map should open as a compiled map: the file itself if it is
+# one, else its compiled copy if that was built from the file's current contents, else None
+def find_compiled(file_path):
+    with open(file_path, 'rb') as file:
+        if file.read(len(MAGIC)) == MAGIC:
+            return file_path
+    twin = compiled_path(file_path)
+    try:
+        with open(twin, 'rb') as file:
+            source = read_header(file)[0]
+    except (OSError, ValueError):
+        return None
+    return twin if source == source_hash(file_path) else None
+
+# Function to write a compiled map. The file is written under a temporary name and renamed,
+# so processes opening it never see a half-written map.
+def write_compiled(output_path, grid, initial_state, goal_states, source=bytes(16), distances=None):
+    sections = [(CELLS, grid.cells)]
+    if grid.costs is not None:
+        sections.append((COSTS, grid.costs))
+    if distances is not None:
+        distances = array('i', distances)
+        if sys.byteorder == 'big':
+            distances.byteswap()
+        sections.append((DISTANCES, distances))
+
+    offset = align(HEADER.size + GOAL.size * len(goal_states) + SECTION.size * len(sections))
+    table = []
+    for tag, data in sections:
+        length = len(data) * getattr(data, 'itemsize', 1)
+        table.append((tag, offset, length))
+        offset = align(offset + length)
+
+    temporary_path = output_path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, source, grid.num_rows, grid.num_cols,
+                               initial_state[0], initial_state[1], len(goal_states), len(sections)))
+        for goal in goal_states:
+            file.write(GOAL.pack(*goal))
+        for entry in table:
+            file.write(SECTION.pack(*entry))
+        for (_, data), (_, offset, _) in zip(sections, table):
+            file.seek(offset)
+            file.write(data)
+    os.replace(temporary_path, output_path)
+
+# Function to open a compiled map, returning (grid, initial_state, goal_states) like load_map.
+# A stored distance field is put into the shared distance field cache.
+def open_compiled(file_path):
+    with open(file_path, 'rb') as file:
+        _, num_rows, num_cols, initial_state, goal_states, sections = read_header(file)
+        size = os.fstat(file.fileno()).st_size
+
+        def map_section(tag, length):
+            if tag not in sections:
+                return None
+            offset, stored_length = sections[tag]
+            if stored_length != length or offset + length > size:
+                raise ValueError(f"'{file_path}': section {tag.decode()} has the wrong size")
+            if length == 0:
+                return bytearray()
+            return mmap.mmap(file.fileno(), length, access=mmap.ACCESS_COPY, offset=offset)
+
+        cells = map_section(CELLS, num_rows * num_cols)
+        if cells is None:
+            raise ValueError(f"'{file_path}' has no cells")
+        grid = GridMap(num_rows, num_cols, cells)
+        costs = map_section(COSTS, num_rows * num_cols)
+        if costs is not None:
+            grid.costs = memoryview(costs)  # iterating an mmap gives bytes; cost_range() needs ints
+        distances = map_section(DISTANCES, 4 * num_rows * num_cols)
+
+    if distances is not None:
+        if sys.byteorder == 'big':
+            distances = array('i', bytes(distances))
+            distances.byteswap()
+        else:
+            distances = memoryview(distances).cast('i')
+        distance_field_cache.add(grid, DistanceField(grid, goal_states, distances))
+    return grid, initial_state, goal_states
+
+# Function to compile a text map next to it (or to output_path) and return the written path
+def compile_map(file_path, output_path=None, with_distance_field=False):
+    grid, initial_state, goal_states = load_text_map(file_path)
+    distances = compute_distance_field(grid, goal_states) if with_distance_field else None
+    output_path = output_path or compiled_path(file_path)
+    write_compiled(output_path, grid, initial_state, goal_states, source_hash(file_path), distances)
+    return output_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile text maps into memory-mapped binary maps.")
+    parser.add_argument('maps', nargs='+', help="text map files; each is written to <map>" + SUFFIX)
+    parser.add_argument('--output', help="output path (only with a single map)")
+    parser.add_argument('--distance-field', action='store_true',
+                        help="also store the distance field of the map's goals (4 bytes per cell)")
+    args = parser.parse_args(argv)
+    if args.output and len(args.maps) > 1:
+        parser.error("--output needs exactly one map")
+
+    for file_path in args.maps:
+        try:
+            output_path = compile_map(file_path, args.output, args.distance_field)
+        except (OSError, ValueError) as error:
+            print(f"Error: {error}", file=sys.stderr)
+            sys.exit(1)
+        print(f"{file_path} -> {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from bisect import bisect_right
+from grid_map import BLOCK
+from map_cache import MapCache
+
+# Translates grid cells into 1 for blocks and 0 for every other cell
+BLOCKED_MASK = bytes(1 if code == BLOCK else 0 for code in range(256))
+
+# Connected components of the free cells (4-connected). Cells are grouped into horizontal
+# runs of free cells per row, runs touching a run in the row above are joined with a
+# union-find, and a cell's component is found by bisecting its row's run starts. The work is
+# proportional to the number of runs, not cells, so open maps are labeled quickly.
+class ComponentIndex:
+    def __init__(self, grid):
+        self.num_rows = grid.num_rows
+        self.num_cols = grid.num_cols
+        num_cols = grid.num_cols
+        mask = grid.translate(BLOCKED_MASK)
+        parent = []
+        self.run_starts = []
+        self.run_ends = []
+        row_runs = []  # first run id of each row
+
+        def find(run):
+            root = run
+            while parent[root] != root:
+                root = parent[root]
+            while parent[run] != root:
+                parent[run], run = root, parent[run]
+            return root
+
+        for y in range(self.num_rows):
+            row_start = y * num_cols
+            row_end = row_start + num_cols
+            starts, ends = [], []
+            first_run = len(parent)
+            position = mask.find(0, row_start, row_end)
+            while position != -1:
+                end = mask.find(1, position, row_end)
+                if end == -1:
+                    end = row_end
+                starts.append(position - row_start)
+                ends.append(end - row_start)
+                parent.append(len(parent))
+                position = mask.find(0, end, row_end) if end < row_end else -1
+
+            # Join with the overlapping runs of the row above (two-pointer sweep)
+            if y > 0:
+                above_starts, above_ends = self.run_starts[-1], self.run_ends[-1]
+                above_first = row_runs[-1]
+                i = j = 0
+                while i < len(starts) and j < len(above_starts):
+                    if starts[i] < above_ends[j] and above_starts[j] < ends[i]:
+                        a, b = find(first_run + i), find(above_first + j)
+                        if a != b:
+                            parent[a] = b
+                    if ends[i] < above_ends[j]:
+                        i += 1
+                    else:
+                        j += 1
+            self.run_starts.append(starts)
+            self.run_ends.append(ends)
+            row_runs.append(first_run)
+
+        # Number the components 0, 1, 2, ... in reading order of their first run
+        labels = {}
+        self.run_labels = []
+        for y in range(self.num_rows):
+            first_run = row_runs[y]
+            row_labels = []
+            for i in range(len(self.run_starts[y])):
+                root = find(first_run + i)
+                row_labels.append(labels.setdefault(root, len(labels)))
+            self.run_labels.append(row_labels)
+        self.count = len(labels)
+
+    # Component number of cell, or None for blocked and out-of-grid cells
+    def component(self, cell):
+        x, y = cell
+        if not (0 <= x < self.num_cols and 0 <= y < self.num_rows):
+            return None
+        i = bisect_right(self.run_starts[y], x) - 1
+        if i < 0 or x >= self.run_ends[y][i]:
+            return None
+        return self.run_labels[y][i]
+
+    def connected(self, a, b):
+        label = self.component(a)
+        return label is not None and label == self.component(b)
+
+    # The goals a search from start can reach, in their original order
+    def reachable_goals(self, start, goal_states):
+        label = self.component(start)
+        if label is None:
+            return []
+        return [goal for goal in goal_states if self.component(goal) == label]
+
+# LRU cache of component indexes keyed by the map's content hash
+class ComponentCache(MapCache):
+    def build(self, grid):
+        return ComponentIndex(grid)
+
+# Shared cache used by the solvers
+component_cache = ComponentCache()
+
+# Function for the solvers: the goals reachable from start on grid, from the cached index
+def reachable_goals(grid, start, goal_states):
+    return component_cache.get(grid).reachable_goals(start, goal_states)
@@ -1,72 +1,35 @@
 import sys
-import re
-import tkinter as tk
 import time
 import itertools
+from grid_map import read_map_file, BLOCK, GOAL
+from search_trace import TraceWriter, split_trace_option
+from search_stats import SearchStats, split_stats_option
+from grid_canvas import GridCanvas, BASE
 
 # GUI global variables
 window = None
-grid_frame = None
-
-# Function to read input file
-def read_input_file(file_path):
-    try:
-        with open(file_path, 'r') as file:
-            content = file.readlines()
-        content = [line.split('//')[0].strip() for line in content if line.strip() and not line.strip().startswith('//')]
-        return content
-    except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
-        sys.exit(1)
-
-# Function to extract grid dimensions from the first line of the file
-def extract_grid_dimensions(line):
-    numbers = re.findall(r'\d+', line)
-    if len(numbers) >= 2:
-        return int(numbers[0]), int(numbers[1])
-    else:
-        print("Error: The first line should contain at least two numbers.")
-        sys.exit(1)
-
-# Function to create an empty grid
-def create_empty_grid(num_rows, num_cols, initial_state, goal_states):
-    grid = [['-' for _ in range(num_cols)] for _ in range(num_rows)]
-    grid[initial_state[1]][initial_state[0]] = 'R'
-    for goal in goal_states:
-        grid[goal[1]][goal[0]] = 'G'
-    return grid
-
-# Function to place blocks on the grid
-def place_blocks(grid, blocks):
-    for block in blocks:
-        x, y, w, h = block
-        for i in range(h):
-            for j in range(w):
-                if 0 <= y+i < len(grid) and 0 <= x+j < len(grid[0]):
-                    grid[y+i][x+j] = 'X'
-
-# Function to update the GUI
-def update_gui(grid, current, path=[], visited=set()):
-    global grid_frame
-    for widget in grid_frame.winfo_children():
-        widget.destroy()
-    cell_size = 70
-    for y in range(len(grid)):
-        for x in range(len(grid[0])):
-            color = 'white'
-            if grid[y][x] == 'X':
-                color = 'black'
-            elif grid[y][x] == 'G':
-                color = 'green'
-            if (x, y) in path:
-                color = 'yellow'
-            elif (x, y) == current:
-                color = 'blue'
-            elif (x, y) in visited:
-                color = 'lightgrey'
-            cell = tk.Frame(grid_frame, width=cell_size, height=cell_size, bg=color, borderwidth=1, relief="solid")
-            cell.grid(row=y, column=x)
-    window.update()
+view = None  # GridCanvas while the GUI is shown
+
+# Cell colors, highest priority first; BASE is the map's walls and goals
+GUI_LAYERS = [('path', 'yellow'), ('current', 'blue'), ('visited', 'lightgrey'), BASE]
+MAP_COLORS = {BLOCK: 'black', GOAL: 'green'}
+shown_path = []  # the path as last passed to update_gui
+
+# Function to update the GUI. visited holds only the cells visited since the previous call, and
+# the path is compared from where it last changed: the search stack only grows and shrinks at
+# its end, so a step costs the same however long the path or the visited set has grown.
+# Only the final call is drawn at once; the steps in between go through the frame-rate limit.
+def update_gui(grid, current, path=[], visited=(), final=False):
+    keep = min(len(shown_path), len(path))
+    while keep and shown_path[keep - 1] != path[keep - 1]:
+        keep -= 1
+    view.remove_from_layer('path', shown_path[keep:])
+    del shown_path[keep:]
+    shown_path.extend(path[keep:])
+    view.add_to_layer('path', shown_path[keep:])
+    view.set_layer('current', [current] if current is not None else [])
+    view.add_to_layer('visited', visited)  # Cells only ever join the visited set
+    view.render(force=final)
     time.sleep(0.5)
 
 # Function to get direction between two points
@@ -81,22 +44,70 @@ def get_direction(from_node, to_node):
     dy = to_node[1] - from_node[1]
     return directions.get((dx, dy), 'UNKNOWN')
 
+# Neighbor order used by the search: up, left, down, right
+DIRECTIONS = [(0, -1), (-1, 0), (0, 1), (1, 0)]
+
+# Depth-First Search as a generator: yields each cell as it is expanded and finally returns
+# (found, path, goal_node, visited_count). The search keeps one stack of cells from the start
+# to the current cell and one stack of neighbor iterators, so the cells on the stack are the
+# parent chain and the path is only copied once, when a goal is reached.
+def dfs_steps(grid, x, y, goal_states, visited, path=(), update_gui_callback=None, trace=None, stats=None):
+    stats = stats if stats is not None else SearchStats('dfs')
+    stack = list(path)
+    neighbors = []
+    cell = (x, y)
+    stats.pushes += 1
+    while cell is not None:
+        visited.add(cell)
+        expanded = cell
+        stats.expansions += 1
+        if trace:
+            trace.expand(cell)
+        yield cell
+        stack.append(cell)
+        stats.open_size(len(stack))
+        if cell in goal_states:
+            stats.closed_size(len(visited))
+            if trace:
+                trace.path_found(stack)
+            return True, stack, cell, len(visited)  # Return path, goal node, and visited nodes count
+        neighbors.append(iter(DIRECTIONS))
+
+        # Advance to the next unvisited neighbor, backtracking out of dead ends
+        cell = None
+        while neighbors and cell is None:
+            cx, cy = stack[-1]
+            for dx, dy in neighbors[-1]:
+                nx, ny = cx + dx, cy + dy
+                if not grid.is_free(nx, ny):
+                    continue
+                stats.generations += 1
+                if (nx, ny) not in visited:
+                    if update_gui_callback:
+                        with stats.phase('render'):
+                            update_gui_callback(grid, (nx, ny), stack, (expanded,))
+                    if trace:
+                        trace.push((nx, ny))
+                    stats.pushes += 1
+                    cell = (nx, ny)
+                    break
+            else:
+                neighbors.pop()
+                dead_end = stack.pop()
+                stats.pops += 1
+                if trace:
+                    trace.pop(dead_end)  # Dead end: backtrack out of this cell
+    stats.closed_size(len(visited))
+    return False, list(path), None, len(visited)
+
 # Depth-First Search function with goal node, visited nodes count, and path directions
-def dfs(grid, x, y, goal_states, visited, path=[], update_gui_callback=None):
-    visited.add((x, y))
-    if (x, y) in goal_states:
-        return True, path + [(x, y)], (x, y), len(visited)  # Return path, goal node, and visited nodes count
-    directions = [(0, -1), (-1, 0), (0, 1), (1, 0)]
-    for dx, dy in directions:
-        nx, ny = x + dx, y + dy
-        if 0 <= nx < len(grid[0]) and 0 <= ny < len(grid) and grid[ny][nx] not in ['X', 'V'] and (nx, ny) not in visited:
-            current_path = path + [(x, y)]
-            if update_gui_callback:
-                update_gui_callback(grid, (nx, ny), current_path, visited)
-            found, new_path, goal_node, visited_count = dfs(grid, nx, ny, goal_states, visited, current_path, update_gui_callback)
-            if found:
-                return True, new_path, goal_node, visited_count
-    return False, path, None, len(visited)
+def dfs(grid, x, y, goal_states, visited, path=(), update_gui_callback=None, trace=None, stats=None):
+    steps = dfs_steps(grid, x, y, goal_states, visited, path, update_gui_callback, trace, stats)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as result:
+            return result.value
 
 # Function to calculate directions from path
 def calculate_directions(path):
@@ -105,11 +116,11 @@ def calculate_directions(path):
 
 # Function to initialize the GUI
 def init_gui(grid):
-    global window, grid_frame
+    global window, view
+    import tkinter as tk
     window = tk.Tk()
     window.title("DFS Pathfinding Visualization")
-    grid_frame = tk.Frame(window)
-    grid_frame.pack()
+    view = GridCanvas(grid, window, GUI_LAYERS, MAP_COLORS)
 
     # Update the GUI with the initial grid state before any search
     update_gui(grid, None)
@@ -126,40 +137,42 @@ def init_gui(grid):
 
 
 # Main function
-def main(file_path, use_gui=False):
-    content = read_input_file(file_path)
-    num_rows, num_cols = extract_grid_dimensions(content[0])
-    initial_state = tuple(map(int, re.findall(r'\d+', content[1])))
-    goal_states = [tuple(map(int, re.findall(r'\d+', x))) for x in content[2].split('|')]
-    blocks = [tuple(map(int, re.findall(r'\d+', x))) for x in content[3:]]
-    grid = create_empty_grid(num_rows, num_cols, initial_state, goal_states)
-    place_blocks(grid, blocks)
+def main(file_path, use_gui=False, trace_path=None, show_stats=False):
+    stats = SearchStats('dfs')
+    grid, initial_state, goal_states = read_map_file(file_path, stats)
+    trace = TraceWriter(trace_path, grid) if trace_path else None
     visited = set()
     if use_gui:
         init_gui(grid)
-        found, path, goal_node, visited_count = dfs(grid, initial_state[0], initial_state[1], set(goal_states), visited, update_gui_callback=update_gui)
+    with stats.phase('search'):
+        found, path, goal_node, visited_count = dfs(grid, initial_state[0], initial_state[1], set(goal_states), visited,
+                                                    update_gui_callback=update_gui if use_gui else None,
+                                                    trace=trace, stats=stats)
+    if trace:
+        trace.close()
+    with stats.phase('render'):
         if found:
             print(f"Path found to goal {goal_node} with {visited_count} nodes visited.")
             directions = calculate_directions(path)
-            print("Directions:", directions)
-            update_gui(grid, None, path, visited)
+            if use_gui:
+                print("Directions:", directions)
+                update_gui(grid, None, path, visited, final=True)
+            else:
+                print("Path:", path)
+                print("Directions:", directions)
         else:
             print("No path found.")
+    if show_stats:
+        print(stats.to_json())
+    if use_gui:
         window.mainloop()
-    else:
-        found, path, goal_node, visited_count = dfs(grid, initial_state[0], initial_state[1], set(goal_states), visited)
-        if found:
-            print(f"Path found to goal {goal_node} with {visited_count} nodes visited.")
-            directions = calculate_directions(path)
-            print("Path:", path)
-            print("Directions:", directions)
-        else:
-            print("No path found.")
 
 if __name__ == "__main__":
-    use_gui = '--gui' in sys.argv
-    args = [arg for arg in sys.argv[1:] if arg != '--gui']
+    trace_path, argv = split_trace_option(sys.argv)
+    show_stats, argv = split_stats_option(argv)
+    use_gui = '--gui' in argv
+    args = [arg for arg in argv[1:] if arg != '--gui']
     if len(args) != 1:
-        print("Usage: python script.py <file_path> [--gui]")
+        print("Usage: python script.py <file_path> [--gui] [--trace <trace_file>] [--stats]")
         sys.exit(1)
-    main(args[0], use_gui)
+    main(args[0], use_gui, trace_path, show_stats)
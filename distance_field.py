@@ -0,0 +1,137 @@
+from array import array
+from grid_map import BLOCK
+from map_cache import MapCache
+
+UNREACHABLE = -1
+
+# Function to run one reverse multi-source BFS from every free goal cell.
+# Returns a flat int32 array with the step distance to the nearest goal, or UNREACHABLE.
+# With a SearchStats the BFS is counted into it like a search: every reached cell is pushed,
+# popped and expanded once.
+def compute_distance_field(grid, goal_states, stats=None):
+    num_rows, num_cols = grid.num_rows, grid.num_cols
+    size = num_rows * num_cols
+    cells = grid.cells
+    distances = array('i', [UNREACHABLE]) * size
+    frontier = []
+    for x, y in goal_states:
+        if grid.is_free(x, y) and distances[y * num_cols + x] == UNREACHABLE:
+            distances[y * num_cols + x] = 0
+            frontier.append(y * num_cols + x)
+
+    distance = 0
+    reached = len(frontier)
+    generations = 0
+    peak_frontier = len(frontier)
+    last_col = num_cols - 1
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for i in frontier:
+            x = i % num_cols
+            if i >= num_cols:
+                j = i - num_cols
+                if cells[j] != BLOCK:
+                    generations += 1
+                    if distances[j] == UNREACHABLE:
+                        distances[j] = distance
+                        next_frontier.append(j)
+            if x > 0:
+                j = i - 1
+                if cells[j] != BLOCK:
+                    generations += 1
+                    if distances[j] == UNREACHABLE:
+                        distances[j] = distance
+                        next_frontier.append(j)
+            j = i + num_cols
+            if j < size and cells[j] != BLOCK:
+                generations += 1
+                if distances[j] == UNREACHABLE:
+                    distances[j] = distance
+                    next_frontier.append(j)
+            if x < last_col:
+                j = i + 1
+                if cells[j] != BLOCK:
+                    generations += 1
+                    if distances[j] == UNREACHABLE:
+                        distances[j] = distance
+                        next_frontier.append(j)
+        frontier = next_frontier
+        reached += len(frontier)
+        peak_frontier = max(peak_frontier, len(frontier))
+    if stats is not None:
+        stats.expansions += reached
+        stats.generations += generations
+        stats.pushes += reached
+        stats.pops += reached
+        stats.open_size(peak_frontier)
+        stats.closed_size(reached)
+    return distances
+
+# Distances from every cell to the nearest goal of one goal set on one map. distances can be
+# passed in when they were computed earlier, e.g. read from a compiled map.
+class DistanceField:
+    def __init__(self, grid, goal_states, distances=None, stats=None):
+        self.num_rows = grid.num_rows
+        self.num_cols = grid.num_cols
+        self.goal_states = tuple(goal_states)
+        self.distances = compute_distance_field(grid, goal_states, stats) if distances is None else distances
+
+    # Exact number of steps from cell to the nearest goal, or None if no goal can be reached
+    def distance(self, cell):
+        x, y = cell
+        if not (0 <= x < self.num_cols and 0 <= y < self.num_rows):
+            return None
+        distance = self.distances[y * self.num_cols + x]
+        return None if distance == UNREACHABLE else distance
+
+    # Perfect heuristic for A*: the true remaining cost, infinite where no goal is reachable
+    def heuristic(self, cell):
+        distance = self.distances[cell[1] * self.num_cols + cell[0]]
+        return float('inf') if distance == UNREACHABLE else distance
+
+    # Follow the distance gradient down to a goal in O(path length).
+    # Neighbors are tried in the solvers' usual up, left, down, right order.
+    def path_from(self, start):
+        distances, num_cols = self.distances, self.num_cols
+        x, y = start
+        if self.distance(start) is None:
+            return []
+        i = y * num_cols + x
+        distance = distances[i]
+        path = [start]
+        while distance > 0:
+            distance -= 1
+            if y > 0 and distances[i - num_cols] == distance:
+                i -= num_cols
+                y -= 1
+            elif x > 0 and distances[i - 1] == distance:
+                i -= 1
+                x -= 1
+            elif y < self.num_rows - 1 and distances[i + num_cols] == distance:
+                i += num_cols
+                y += 1
+            else:
+                i += 1
+                x += 1
+            path.append((x, y))
+        return path
+
+# LRU cache of distance fields keyed by the map's content hash plus the goal set.
+# With a SearchStats, building a missing field is counted into it and timed as 'build'.
+class DistanceFieldCache(MapCache):
+    def key(self, grid, goal_states, stats=None):
+        return grid.content_hash(), tuple(sorted(set(goal_states)))
+
+    def build(self, grid, goal_states, stats=None):
+        if stats is None:
+            return DistanceField(grid, goal_states)
+        with stats.phase('build'):
+            return DistanceField(grid, goal_states, stats=stats)
+
+    # Store a field that was computed elsewhere
+    def add(self, grid, field):
+        self.store(self.key(grid, field.goal_states), field)
+
+# Shared cache used by the solvers
+distance_field_cache = DistanceFieldCache()
@@ -1,127 +1,194 @@
-import tkinter as tk
 import sys
-import re
 import time
+from grid_map import read_map_file
+from search_trace import TraceWriter, split_trace_option
+from search_stats import SearchStats, split_stats_option
+from grid_canvas import GridCanvas, BASE
 
-# Initialize the GUI window and grid frame
+# Initialize the GUI window and grid view
 window = None
-grid_frame = None
-
-def read_input_file(file_path):
-    try:
-        with open(file_path, 'r') as file:
-            content = file.readlines()
-        content = [line.split('//')[0].strip() for line in content if line.strip() and not line.strip().startswith('//')]
-        return content
-    except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
-        sys.exit(1)
-
-def extract_grid_dimensions(line):
-    numbers = re.findall(r'\d+', line)
-    if len(numbers) >= 2:
-        return int(numbers[0]), int(numbers[1])
-    else:
-        print("Error: The first line should contain at least two numbers.")
-        sys.exit(1)
-
-def create_empty_grid(num_rows, num_cols, initial_state, goal_states):
-    grid = [['-' for _ in range(num_cols)] for _ in range(num_rows)]
-    grid[initial_state[1]][initial_state[0]] = 'R'
-    for goal in goal_states:
-        grid[goal[1]][goal[0]] = 'G'
-    return grid
-
-def place_blocks(grid, blocks):
-    for block in blocks:
-        x, y, w, h = block
-        for i in range(h):
-            for j in range(w):
-                if 0 <= y+i < len(grid) and 0 <= x+j < len(grid[0]):
-                    grid[y+i][x+j] = 'X'
-
-import tkinter as tk
-import sys
-import re
-import time
+view = None  # GridCanvas while the GUI is shown
 
-# Initialize the GUI window and grid frame
-window = None
-grid_frame = None
+# Cell colors, highest priority first; BASE is the map's walls, start and goals
+GUI_LAYERS = [('current', 'red'), ('path', 'light blue'), BASE]
 
 def init_gui(grid):
-    global window, grid_frame
+    global window, view
+    import tkinter as tk
     window = tk.Tk()
     window.title("DLS Pathfinding Visualization")
-    grid_frame = tk.Frame(window)
-    grid_frame.pack()
+    view = GridCanvas(grid, window, GUI_LAYERS)
     update_gui(grid, [], None)
 
 def update_gui(grid, current_path=[], current=None):
-    global grid_frame
-    cell_size = 50
-
-    for widget in grid_frame.winfo_children():
-        widget.destroy()
-
-    for y in range(len(grid)):
-        for x in range(len(grid[0])):
-            color = 'white'
-            if grid[y][x] == 'X':
-                color = 'black'
-            elif grid[y][x] == 'G':
-                color = 'green'
-            elif grid[y][x] == 'R':
-                color = 'blue'
-            if (x, y) in current_path:
-                color = 'light blue'  # Color for the current path
-            if (x, y) == current:
-                color = 'red'  # Color for the current position
-            cell = tk.Frame(grid_frame, width=cell_size, height=cell_size, bg=color, borderwidth=1, relief="solid")
-            cell.grid(row=y, column=x)
-    window.update_idletasks()
-    window.update()
+    view.set_layer('path', current_path)
+    view.set_layer('current', [current] if current is not None else [])
+    view.render(force=current is None)  # Final and cleared paths are always drawn
     time.sleep(0.5)  # Slow down the update speed for better visualization
 
-def dls(grid, start, goal, limit, update_func, visited, path=[]):
+def dls(grid, start, goal, limit, update_func, visited, path=[], trace=None, stats=None):
+    stats = stats if stats is not None else SearchStats('dls')
     if start == goal:
+        if trace:
+            trace.path_found(path + [start])
         return [start]
     
     if limit == 0:
         return None
     
     visited.add(start)
+    stats.closed_size(len(visited))
     new_path = path + [start]
-    update_func(grid, new_path, start)
+    stats.open_size(len(new_path))
+    stats.expansions += 1
+    if trace:
+        trace.expand(start)
+    with stats.phase('render'):
+        update_func(grid, new_path, start)
     
     for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
         next_pos = (start[0] + dx, start[1] + dy)
-        if 0 <= next_pos[0] < len(grid[0]) and 0 <= next_pos[1] < len(grid) and grid[next_pos[1]][next_pos[0]] != 'X' and next_pos not in visited:
-            result_path = dls(grid, next_pos, goal, limit - 1, update_func, visited, new_path)
+        if grid.is_free(next_pos[0], next_pos[1]) and next_pos not in visited:
+            stats.generations += 1
+            stats.pushes += 1
+            if trace:
+                trace.push(next_pos)
+            result_path = dls(grid, next_pos, goal, limit - 1, update_func, visited, new_path, trace, stats)
             if result_path:
                 return result_path
     
+    stats.pops += 1
+    if trace:
+        trace.pop(start)
     return None
 
-def dls_console(grid, start, goal, limit, visited=set(), path=[]):
+def dls_console(grid, start, goal, limit, visited=None, path=[], trace=None, stats=None):
+    if visited is None:
+        visited = set()
+    stats = stats if stats is not None else SearchStats('dls')
     if start == goal:
+        if trace:
+            trace.path_found(path + [start])
         return path + [start]
     
     if limit <= 0 or start in visited:
         return None
     
     visited.add(start)
+    stats.closed_size(len(visited))
     new_path = path + [start]
+    stats.open_size(len(new_path))
+    stats.expansions += 1
+    if trace:
+        trace.expand(start)
     
     for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
         next_pos = (start[0] + dx, start[1] + dy)
-        if 0 <= next_pos[0] < len(grid[0]) and 0 <= next_pos[1] < len(grid) and grid[next_pos[1]][next_pos[0]] != 'X':
-            result_path = dls_console(grid, next_pos, goal, limit - 1, visited, new_path)
+        if grid.is_free(next_pos[0], next_pos[1]):
+            stats.generations += 1
+            stats.pushes += 1
+            if trace:
+                trace.push(next_pos)
+            result_path = dls_console(grid, next_pos, goal, limit - 1, visited, new_path, trace, stats)
             if result_path is not None:
                 return result_path
     
+    stats.pops += 1
+    if trace:
+        trace.pop(start)
     return None
 
+# Neighbor order used by dls and dls_console: down, right, up, left
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+# One depth-limited pass towards any of the goals, on an explicit stack.
+# best_depth is the pass's transposition table: the smallest depth each cell has been reached
+# at. A cell is only entered again when it is reached by a shorter route, so unlike the
+# visited set of dls_console a cell first seen on a long detour does not hide shorter paths.
+# Returns (path, expansions) with path None when no goal is within limit steps.
+def depth_limited_search(grid, start, goals, limit, best_depth, update_func=None, trace=None, stats=None):
+    stats = stats if stats is not None else SearchStats('dls')
+    best_depth[start] = 0
+    path = [start]
+    neighbors = [iter(DIRECTIONS)]
+    expansions = 1
+    stats.pushes += 1
+    if trace:
+        trace.expand(start)
+    if update_func:
+        update_func(grid, path, start)
+
+    while neighbors:
+        x, y = path[-1]
+        depth = len(path)  # depth of the neighbors of the current cell
+        for dx, dy in neighbors[-1]:
+            next_pos = (x + dx, y + dy)
+            if not grid.is_free(next_pos[0], next_pos[1]):
+                continue
+            stats.generations += 1
+            seen_depth = best_depth.get(next_pos)
+            if seen_depth is not None and seen_depth <= depth:
+                continue
+            best_depth[next_pos] = depth
+            stats.pushes += 1
+            if trace:
+                trace.push(next_pos)
+            if next_pos in goals:
+                path.append(next_pos)
+                stats.expansions += expansions
+                stats.closed_size(len(best_depth))
+                if trace:
+                    trace.path_found(path)
+                return path, expansions
+            if depth < limit:
+                path.append(next_pos)
+                neighbors.append(iter(DIRECTIONS))
+                expansions += 1
+                if seen_depth is not None:
+                    stats.reexpansions += 1  # Reached again by a shorter route
+                stats.open_size(len(path))
+                if trace:
+                    trace.expand(next_pos)
+                if update_func:
+                    update_func(grid, path, next_pos)
+                break
+        else:
+            neighbors.pop()
+            dead_end = path.pop()
+            stats.pops += 1
+            if trace:
+                trace.pop(dead_end)
+    stats.expansions += expansions
+    stats.closed_size(len(best_depth))
+    return None, expansions
+
+# Iterative deepening: depth-limited passes with limits 1, 2, 3, ... against all goals at once.
+# The first path found is a shortest one, while memory stays proportional to the cells reached.
+# Stops early once a pass reaches no cell the previous pass did not, i.e. the start's whole
+# area has been searched. Returns (path, expansions) with path None when no goal is reachable.
+def iterative_deepening_search(grid, start, goal_states, max_depth=None, update_func=None, trace=None, stats=None):
+    stats = stats if stats is not None else SearchStats('iddfs')
+    goals = set(goal_states)
+    if start in goals:
+        if trace:
+            trace.path_found([start])
+        return [start], 0
+    if max_depth is None:
+        max_depth = grid.num_rows * grid.num_cols
+    expansions = 0
+    reached = 0
+    for limit in range(1, max_depth + 1):
+        best_depth = {}
+        stats.iterations += 1
+        path, pass_expansions = depth_limited_search(grid, start, goals, limit, best_depth, update_func, trace, stats)
+        expansions += pass_expansions
+        if path:
+            return path, expansions
+        if len(best_depth) == reached:
+            break
+        reached = len(best_depth)
+    return None, expansions
+
 def print_grid(grid, path=[]):
     # Prints the grid and marks the path from start to goal
     for y in range(len(grid)):
@@ -144,49 +211,85 @@ def print_grid(grid, path=[]):
             row += cell
         print(row)
 
-def main(file_path, depth_limit, use_gui=False):
-    content = read_input_file(file_path)
-    num_rows, num_cols = extract_grid_dimensions(content[0])
-    initial_state = tuple(map(int, re.findall(r'\d+', content[1])))
-    goal_states = [tuple(map(int, re.findall(r'\d+', x))) for x in content[2].split('|')]
-    blocks = [tuple(map(int, re.findall(r'\d+', x))) for x in content[3:]]
-    grid = create_empty_grid(num_rows, num_cols, initial_state, goal_states)
-    place_blocks(grid, blocks)
+def main(file_path, depth_limit, use_gui=False, trace_path=None, iterative=False, show_stats=False):
+    stats = SearchStats('iddfs' if iterative else 'dls')
+    grid, initial_state, goal_states = read_map_file(file_path, stats)
+    trace = TraceWriter(trace_path, grid) if trace_path else None
 
-    if use_gui:
+    if iterative:
+        if use_gui:
+            init_gui(grid)
+        with stats.phase('search'):
+            path, expansions = iterative_deepening_search(grid, initial_state, goal_states, depth_limit,
+                                                          update_gui if use_gui else None, trace, stats)
+        if trace:
+            trace.close()
+        with stats.phase('render'):
+            if path:
+                print("Path found from", initial_state, "to goal state:", path[-1], "at depth", len(path) - 1)
+                print("Path:", path)
+                print("Nodes expanded:", expansions)
+                if use_gui:
+                    update_gui(grid, path, None)
+                else:
+                    print_grid(grid, path)
+            else:
+                print("No path found from", initial_state, "to any goal state" +
+                      (f" within depth {depth_limit}" if depth_limit is not None else ""))
+        if show_stats:
+            print(stats.to_json())
+        if use_gui:
+            window.mainloop()
+    elif use_gui:
         init_gui(grid)
         for goal in goal_states:
             visited = set()
-            path = dls(grid, initial_state, goal, depth_limit, update_gui, visited, [])
+            with stats.phase('search'):
+                path = dls(grid, initial_state, goal, depth_limit, update_gui, visited, [], trace, stats)
             if path:
                 print("Path found from", initial_state, "to goal state:", goal)
                 print("Path:", path)
-                update_gui(grid, path, None)  # Update GUI to show the final path
+                with stats.phase('render'):
+                    update_gui(grid, path, None)  # Update GUI to show the final path
                 break
+        if trace:
+            trace.close()
         if not path:
             print("No path found from", initial_state, "to any goal state.")
             update_gui(grid, [], None)  # Clear path visualization
+        if show_stats:
+            print(stats.to_json())
         window.mainloop()
     else:
         for goal in goal_states:
             visited = set()
-            path = dls_console(grid, initial_state, goal, depth_limit, visited, [])
+            with stats.phase('search'):
+                path = dls_console(grid, initial_state, goal, depth_limit, visited, [], trace, stats)
             if path:
-                print("Path found from", initial_state, "to goal state:", goal)
-                print("Path:", path)
-                print_grid(grid, path)  # Print the grid with the path marked
+                with stats.phase('render'):
+                    print("Path found from", initial_state, "to goal state:", goal)
+                    print("Path:", path)
+                    print_grid(grid, path)  # Print the grid with the path marked
                 break
+        if trace:
+            trace.close()
         if not path:
             print("No path found from", initial_state, "to any goal state with depth limit", depth_limit)
+        if show_stats:
+            print(stats.to_json())
 
 if __name__ == "__main__":
-    use_gui = '--gui' in sys.argv
-    args = [arg for arg in sys.argv[1:] if arg != '--gui']
+    trace_path, argv = split_trace_option(sys.argv)
+    show_stats, argv = split_stats_option(argv)
+    use_gui = '--gui' in argv
+    iterative = '--iterative' in argv
+    args = [arg for arg in argv[1:] if arg not in ('--gui', '--iterative')]
 
-    if len(args) != 2:
-        print("Usage: python dls_gui.py <file_path> <depth_limit> [--gui]")
+    if len(args) != 2 and not (iterative and len(args) == 1):
+        print("Usage: python dls_gui.py <file_path> <depth_limit> [--gui] [--trace <trace_file>] [--stats]")
+        print("       python dls_gui.py <file_path> [<max_depth>] --iterative [--gui] [--trace <trace_file>] [--stats]")
         sys.exit(1)
 
     file_path = args[0]
-    depth_limit = int(args[1])
-    main(file_path, depth_limit, use_gui)
+    depth_limit = int(args[1]) if len(args) == 2 else None
+    main(file_path, depth_limit, use_gui, trace_path, iterative, show_stats)
@@ -1,95 +1,91 @@
-import tkinter as tk
 import sys
-import re
-from queue import PriorityQueue
 import time
-
-# Initialize the GUI window and grid frame
+from grid_map import read_map_file, BLOCK
+from open_list import OpenList
+from goal_index import GoalIndex
+from components import reachable_goals
+from search_trace import TraceWriter, split_trace_option
+from search_stats import SearchStats, split_stats_option
+from grid_canvas import GridCanvas, BASE
+
+# Initialize the GUI window and grid view
 window = None
-grid_frame = None
-
-def read_input_file(file_path):
-    try:
-        with open(file_path, 'r') as file:
-            content = file.readlines()
-        content = [line.split('//')[0].strip() for line in content if line.strip() and not line.strip().startswith('//')]
-        return content
-    except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
-        return None
-
-def extract_grid_dimensions(line):
-    numbers = re.findall(r'\d+', line)
-    if len(numbers) >= 2:
-        return int(numbers[0]), int(numbers[1])
-    else:
-        print("Error: The first line should contain at least two numbers.")
-        return None
-
-def create_empty_grid(num_rows, num_cols, initial_state, goal_states):
-    grid = [['-' for _ in range(num_cols)] for _ in range(num_rows)]
-    grid[initial_state[1]][initial_state[0]] = 'R'  # Place the robot at the initial state
-    for goal in goal_states:
-        grid[goal[1]][goal[0]] = 'G'  # Place the goals
-    return grid
-
-def place_blocks(grid, blocks):
-    for block in blocks:
-        x, y, w, h = block
-        for i in range(h):
-            for j in range(w):
-                if 0 <= y+i < len(grid) and 0 <= x+j < len(grid[0]):
-                    grid[y+i][x+j] = 'X'  # Place blocks as obstacles
-
-def manhattan_distance(point, goals):
-    # Start with a large number representing infinity
-    closest_distance = float('inf')
-    # Iterate over each goal and update the closest distance
-    for goal in goals:
-        distance = abs(point[0] - goal[0]) + abs(point[1] - goal[1])
-        if distance < closest_distance:
-            closest_distance = distance
-    return closest_distance
-
-def greedy_best_first_search(grid, start, goal_states, use_gui=True, visualization_speed=0.5):
-    open_set = PriorityQueue()
-    open_set.put((0, start))
+view = None  # GridCanvas while the GUI is shown
+
+# Cell colors, highest priority first; BASE is the map's walls
+GUI_LAYERS = [('current', '#ff4500'), ('start', 'blue'), BASE, ('goals', 'green'), ('path', 'orange'),
+              ('visited', '#f0e68c')]
+MAP_COLORS = {BLOCK: 'black'}
+
+def greedy_best_first_search(grid, start, goal_states, use_gui=True, visualization_speed=0.5, trace=None, stats=None):
+    stats = stats if stats is not None else SearchStats('gbfs')
+    reachable = reachable_goals(grid, start, goal_states)  # Goals walled off from the start are dropped
+    if not reachable:
+        return False, [], None, 0, []
+    goals = GoalIndex(grid, reachable)  # Goal bitmap and nearest-goal distance lookup
+    open_set = OpenList()
+    open_set.push(start, 0, start)
+    stats.pushes += 1
+    if trace:
+        trace.push(start)
     came_from = {start: None}
     visited = set()
+    fresh = []  # cells added to visited since the last GUI update
     num_visited_nodes = 0  # Initialize visited nodes counter
 
-    while not open_set.empty():
-        _, current = open_set.get()
+    while open_set:
+        stats.open_size(len(open_set))
+        current = open_set.pop()
+        stats.pops += 1
         num_visited_nodes += 1  # Increment visited nodes counter
-
-        if current in goal_states:
-            path = reconstruct_path(came_from, current)
-            directions = get_path_directions(path)  # Get directions from the path
+        if trace:
+            trace.expand(current)
+
+        if current in goals:
+            stats.expansions += num_visited_nodes
+            stats.closed_size(len(visited))
+            with stats.phase('reconstruct'):
+                path = reconstruct_path(came_from, current)
+                directions = get_path_directions(path)  # Get directions from the path
+            if trace:
+                trace.path_found(path)
             if use_gui:
-                update_gui(grid, path=path + [current], visited=visited, current=current, start=start, goal_states=goal_states, sleep_time=visualization_speed)
+                update_gui(grid, path=path + [current], visited=fresh, current=current, start=start, goal_states=goal_states, sleep_time=visualization_speed)
             return True, path, current, num_visited_nodes, directions
 
         visited.add(current)
         if use_gui:
-            update_gui(grid, path=[], visited=visited, current=current, start=start, goal_states=goal_states, sleep_time=visualization_speed)
+            fresh.append(current)
+            update_gui(grid, path=[], visited=fresh, current=current, start=start, goal_states=goal_states, sleep_time=visualization_speed)
+            fresh = []
 
         for dx, dy in [(0, -1), (-1, 0), (0, 1), (1, 0)]:
             neighbor = (current[0] + dx, current[1] + dy)
-            if 0 <= neighbor[0] < len(grid[0]) and 0 <= neighbor[1] < len(grid) and grid[neighbor[1]][neighbor[0]] != 'X' and neighbor not in visited:
+            if grid.is_free(neighbor[0], neighbor[1]):
+                stats.generations += 1
+                if neighbor in visited:
+                    continue
                 visited.add(neighbor)
+                if use_gui:
+                    fresh.append(neighbor)
                 came_from[neighbor] = current
-                open_set.put((manhattan_distance(neighbor, goal_states), neighbor))
+                open_set.push(neighbor, goals.nearest_distance(neighbor), neighbor)  # Equal distances are taken in coordinate order
+                stats.pushes += 1
+                if trace:
+                    trace.push(neighbor)
 
     if use_gui:
-        update_gui(grid, path=[], visited=visited, current=None, start=start, goal_states=goal_states, sleep_time=visualization_speed)
+        update_gui(grid, path=[], visited=fresh, current=None, start=start, goal_states=goal_states, sleep_time=visualization_speed)
+    stats.expansions += num_visited_nodes
+    stats.closed_size(len(visited))
     return False, [], None, num_visited_nodes, []
 
 def init_gui(grid, start, goal_states):
-    global window, grid_frame
+    global window, view
+    import tkinter as tk
     window = tk.Tk()
     window.title("GBFS Pathfinding Visualization")
-    grid_frame = tk.Frame(window)
-    grid_frame.pack()
+    view = GridCanvas(grid, window, GUI_LAYERS, MAP_COLORS)
     update_gui(grid, start=start, goal_states=goal_states)  # Initial GUI setup with the start state highlighted
 
 def reconstruct_path(came_from, current):
@@ -115,78 +111,53 @@ def get_path_directions(path):
             directions.append('right')
     return directions
 
-def update_gui(grid, path=[], visited=set(), current=None, start=None, goal_states=None, sleep_time=0.5):
-    global grid_frame, window
-    cell_size = 50
-
-    if goal_states is None:
-        goal_states = []
-
-    for widget in grid_frame.winfo_children():
-        widget.destroy()
-
-    for y in range(len(grid)):
-        for x in range(len(grid[0])):
-            color = 'white'
-            if (x, y) == start:  # Check if the current cell is the start position
-                color = 'blue'  # Color for the start position
-            elif grid[y][x] == 'X':
-                color = 'black'
-            elif (x, y) in goal_states:
-                color = 'green'
-            elif (x, y) in path:
-                color = 'orange'
-            elif (x, y) in visited and (x, y) != current:
-                color = '#f0e68c'
-            if (x, y) == current:
-                color = '#ff4500'
-
-            cell = tk.Frame(grid_frame, width=cell_size, height=cell_size, bg=color, borderwidth=1, relief="solid")
-            cell.grid(row=y, column=x)
-
-    window.update()  # Force the window to update
+# Function to show one search step; visited holds only the cells visited since the previous
+# call, so a step costs the same however many cells the search has seen
+def update_gui(grid, path=[], visited=(), current=None, start=None, goal_states=None, sleep_time=0.5):
+    view.set_layer('current', [current] if current is not None else [])
+    view.set_layer('start', [start] if start is not None else [])
+    view.set_layer('goals', goal_states or [])
+    view.set_layer('path', path)
+    view.add_to_layer('visited', visited)
+    view.render(force=bool(path))  # The final path is always drawn
     time.sleep(sleep_time)  # Slow down the update speed
 
-def main(file_path, use_gui=True):
-    content = read_input_file(file_path)
-    if content is None:
-        sys.exit(1)
-
-    num_rows, num_cols = extract_grid_dimensions(content[0])
-    if num_rows is None or num_cols is None:
-        sys.exit(1)
-
-    initial_state = tuple(map(int, re.findall(r'\d+', content[1])))
-    goal_states = [tuple(map(int, re.findall(r'\d+', x))) for x in content[2].split('|')]
-    blocks = [tuple(map(int, re.findall(r'\d+', x))) for x in content[3:]]
-
-    grid = create_empty_grid(num_rows, num_cols, initial_state, goal_states)
-    place_blocks(grid, blocks)
+def main(file_path, use_gui=True, trace_path=None, show_stats=False):
+    stats = SearchStats('gbfs')
+    grid, initial_state, goal_states = read_map_file(file_path, stats)
+    trace = TraceWriter(trace_path, grid) if trace_path else None
 
     if use_gui:
         init_gui(grid, initial_state, set(goal_states))
-        found, path, goal_node, visited_nodes, path_directions = greedy_best_first_search(grid, initial_state, set(goal_states), use_gui=use_gui, visualization_speed=0.5)
+    with stats.phase('search'):
+        found, path, goal_node, visited_nodes, path_directions = greedy_best_first_search(grid, initial_state, set(goal_states), use_gui=use_gui, visualization_speed=0.5, trace=trace, stats=stats)
+    if trace:
+        trace.close()
+    with stats.phase('render'):
         if found:
-            path = [initial_state] + path
-            update_gui(grid, path=path, visited=set(), current=None, start=initial_state, goal_states=set(goal_states))
+            if use_gui:
+                path = [initial_state] + path
+                view.set_layer('visited', [])  # The final view shows only the path
+                update_gui(grid, path=path, current=None, start=initial_state, goal_states=set(goal_states))
             print(f"Path found from {initial_state} to goal node {goal_node} with {visited_nodes} nodes visited.")
             print(f"Path directions: {path_directions}")
+        elif not use_gui:
+            print(f"No path found after visiting {visited_nodes} nodes.")
+    if show_stats:
+        print(stats.to_json())
+    if use_gui:
+        if found:
             time.sleep(2)  # Give time to visualize the final path
         window.mainloop()
-    else:
-        found, path, goal_node, visited_nodes, path_directions = greedy_best_first_search(grid, initial_state, set(goal_states), use_gui=use_gui, visualization_speed=0.5)
-        if found:
-            print(f"Path found from {initial_state} to goal node {goal_node} with {visited_nodes} nodes visited.")
-            print(f"Path directions: {path_directions}")
-        else:
-            print(f"No path found after visiting {visited_nodes} nodes.")
 
 if __name__ == "__main__":
-    use_gui = '--gui' in sys.argv  # GUI mode is optional and activated with --gui
-    args = [arg for arg in sys.argv[1:] if arg not in ['--console', '--gui']]
+    trace_path, argv = split_trace_option(sys.argv)
+    show_stats, argv = split_stats_option(argv)
+    use_gui = '--gui' in argv  # GUI mode is optional and activated with --gui
+    args = [arg for arg in argv[1:] if arg not in ['--console', '--gui']]
 
     if len(args) != 1:
-        print("Usage Error: python script.py <file_path> [--gui]")
+        print("Usage Error: python script.py <file_path> [--gui] [--trace <trace_file>] [--stats]")
         sys.exit(1)
 
-    main(args[0], use_gui)
+    main(args[0], use_gui, trace_path, show_stats)
@@ -0,0 +1,91 @@
+# Goal sets at or below this size are scanned directly; the tree only pays off beyond it
+LINEAR_SCAN_LIMIT = 8
+LEAF_SIZE = 8
+
+# Goal lookup built once per query: a bitmap over the grid for O(1) goal tests, and a k-d tree
+# of the goals for the Manhattan distance to the nearest one. Every tree node keeps the
+# bounding box of its goals, and a query skips any node whose box is no closer than the best
+# goal found so far, so it looks at a handful of nodes instead of every goal.
+class GoalIndex:
+    def __init__(self, grid, goal_states):
+        self.num_rows = grid.num_rows
+        self.num_cols = grid.num_cols
+        self.goals = list(dict.fromkeys(tuple(goal) for goal in goal_states))
+        self.bitmap = bytearray(self.num_rows * self.num_cols)
+        for x, y in self.goals:
+            if 0 <= x < self.num_cols and 0 <= y < self.num_rows:
+                self.bitmap[y * self.num_cols + x] = 1
+
+        # Flat tree: per node its box (min_x, max_x, min_y, max_y), its two children, or its
+        # goals when it is a leaf
+        self.boxes = []
+        self.children = []
+        self.leaves = []
+        if len(self.goals) > LINEAR_SCAN_LIMIT:
+            self.build(list(self.goals))
+
+    # Function to add the subtree for points and return its node number
+    def build(self, points):
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        node = len(self.boxes)
+        self.boxes.append((min(xs), max(xs), min(ys), max(ys)))
+        self.children.append(None)
+        if len(points) <= LEAF_SIZE:
+            self.leaves.append(points)
+            return node
+        self.leaves.append(None)
+        min_x, max_x, min_y, max_y = self.boxes[node]
+        axis = 0 if max_x - min_x >= max_y - min_y else 1  # split the wider side
+        points.sort(key=lambda point: point[axis])
+        middle = len(points) // 2
+        self.children[node] = (self.build(points[:middle]), self.build(points[middle:]))
+        return node
+
+    def __len__(self):
+        return len(self.goals)
+
+    def __iter__(self):
+        return iter(self.goals)
+
+    # O(1) goal test for cells given as (x, y)
+    def __contains__(self, cell):
+        x, y = cell
+        return 0 <= x < self.num_cols and 0 <= y < self.num_rows and self.bitmap[y * self.num_cols + x] == 1
+
+    # Manhattan distance from cell to the nearest goal (inf when there are no goals)
+    def nearest_distance(self, cell):
+        x, y = cell
+        if not self.boxes:
+            return min((abs(x - gx) + abs(y - gy) for gx, gy in self.goals), default=float('inf'))
+
+        boxes, children, leaves = self.boxes, self.children, self.leaves
+        best = float('inf')
+        stack = [(0, 0)]  # (lower bound, node)
+        while stack:
+            bound, node = stack.pop()
+            if bound >= best:
+                continue
+            leaf = leaves[node]
+            if leaf is not None:
+                for gx, gy in leaf:
+                    distance = abs(x - gx) + abs(y - gy)
+                    if distance < best:
+                        best = distance
+                continue
+            first, second = children[node]
+            first_bound = box_distance(boxes[first], x, y)
+            second_bound = box_distance(boxes[second], x, y)
+            if first_bound > second_bound:
+                first, second = second, first
+                first_bound, second_bound = second_bound, first_bound
+            stack.append((second_bound, second))  # the nearer child is popped first
+            stack.append((first_bound, first))
+        return best
+
+# Function to get the Manhattan distance from (x, y) to the closest point of a box
+def box_distance(box, x, y):
+    min_x, max_x, min_y, max_y = box
+    dx = min_x - x if x < min_x else (x - max_x if x > max_x else 0)
+    dy = min_y - y if y < min_y else (y - max_y if y > max_y else 0)
+    return dx + dy
@@ -0,0 +1,94 @@
+import time
+from grid_map import BLOCK, ROBOT, GOAL
+
+FRAME_RATE = 30  # most redraws per second
+VIEW_SIZE = 700  # largest canvas side in pixels
+MAX_CELL_SIZE = 50
+
+# Stands for the map's own colors (walls, start, goals) in a layer list
+BASE = None
+MAP_COLORS = {BLOCK: 'black', ROBOT: 'blue', GOAL: 'green'}
+
+# Grid view on a single tk.Canvas shared by the solver GUIs. One rectangle per cell is created
+# up front; after that the caller only replaces the cells of named layers (path, open list,
+# visited, ...) and the cells whose layers changed are recolored on the next frame. A cell
+# takes the color of the first layer in `layers` that holds it, where BASE gives the map's own
+# color from map_colors and cells with no color at all are white. Redraws are throttled to
+# frame_rate; changes made between frames are drawn together by the next one. Pacing is up to
+# the caller: the solver scripts sleep after each step so the search can be followed by eye.
+class GridCanvas:
+    def __init__(self, grid, window, layers, map_colors=MAP_COLORS, frame_rate=FRAME_RATE):
+        import tkinter as tk
+        self.grid = grid
+        self.window = window
+        self.layers = layers  # (name, color) pairs and BASE, highest priority first
+        self.map_colors = map_colors
+        self.members = {layer[0]: set() for layer in layers if layer is not BASE}
+        self.frame_time = 1.0 / frame_rate
+        self.last_frame = 0.0
+        self.dirty = set()
+        self.pending = False  # a deferred redraw is scheduled
+
+        num_rows, num_cols = grid.num_rows, grid.num_cols
+        self.cell_size = max(1, min(MAX_CELL_SIZE, VIEW_SIZE // max(num_rows, num_cols)))
+        size = self.cell_size
+        self.canvas = tk.Canvas(window, width=num_cols * size, height=num_rows * size, highlightthickness=0)
+        self.canvas.pack()
+        outline = 'gray' if size > 3 else ''
+        self.rectangles = []
+        for y in range(num_rows):
+            for x in range(num_cols):
+                self.rectangles.append(self.canvas.create_rectangle(
+                    x * size, y * size, (x + 1) * size, (y + 1) * size, fill=self.color((x, y)), outline=outline))
+
+    def color(self, cell):
+        for layer in self.layers:
+            if layer is BASE:
+                color = self.map_colors.get(self.grid.cells[cell[1] * self.grid.num_cols + cell[0]])
+                if color:
+                    return color
+            elif cell in self.members[layer[0]]:
+                return layer[1]
+        return 'white'
+
+    # Replace the cells of a layer; only cells entering or leaving it are redrawn
+    def set_layer(self, name, cells):
+        cells = set(cells)
+        self.dirty |= self.members[name] ^ cells
+        self.members[name] = cells
+
+    # Add cells to a layer without resending the ones already in it
+    def add_to_layer(self, name, cells):
+        members = self.members[name]
+        for cell in cells:
+            if cell not in members:
+                members.add(cell)
+                self.dirty.add(cell)
+
+    def remove_from_layer(self, name, cells):
+        members = self.members[name]
+        for cell in cells:
+            if cell in members:
+                members.remove(cell)
+                self.dirty.add(cell)
+
+    # Draw the pending changes if a frame is due (always with force), else leave them for a
+    # deferred redraw so the last changes still show up once the caller stops updating
+    def render(self, force=False):
+        if not self.dirty:
+            return
+        wait = self.last_frame + self.frame_time - time.perf_counter()
+        if force or wait <= 0:
+            self.redraw()
+            self.window.update()
+        elif not self.pending:
+            self.pending = True
+            self.window.after(max(1, int(wait * 1000)), self.redraw)
+
+    def redraw(self):
+        self.pending = False
+        for cell in self.dirty:
+            self.canvas.itemconfig(self.rectangles[cell[1] * self.grid.num_cols + cell[0]], fill=self.color(cell))
+        self.dirty = set()
+        self.last_frame = time.perf_counter()
+        self.window.update_idletasks()
@@ -0,0 +1,277 @@
+import re
+import sys
+import time
+import hashlib
+
+# Cell codes stored in the grid (one byte per cell, same characters the printers use)
+FREE = ord('-')
+BLOCK = ord('X')
+ROBOT = ord('R')
+GOAL = ord('G')
+
+# Highest step cost a cell can have (costs are stored one byte per cell)
+MAX_COST = 255
+
+# Translation table that keeps blocks and turns every other cell code into FREE
+OBSTACLES_ONLY = bytes(BLOCK if code == BLOCK else FREE for code in range(256))
+
+# Compact grid shared by all solvers: a flat, row-major bytearray with one byte per cell.
+# Grids opened from a compiled map hold a copy-on-write mmap of the file instead.
+# content_hash and cost_range are computed once and kept until the grid changes; set_cell,
+# fill_block and fill_cost forget them, and code writing to cells or costs directly must call
+# changed().
+class GridMap:
+    def __init__(self, num_rows, num_cols, cells=None):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.cells = bytearray([FREE]) * (num_rows * num_cols) if cells is None else cells
+        self.costs = None  # per-cell cost of stepping onto the cell (1-255), None when every step costs 1
+        self.hash = None  # content_hash() of the current cells and costs, None until asked for
+        self.cost_bounds = None  # cost_range() of the current costs, None until asked for
+
+    # Flat index of cell (x, y)
+    def index(self, x, y):
+        return y * self.num_cols + x
+
+    # Cell (x, y) of a flat index
+    def coords(self, i):
+        y, x = divmod(i, self.num_cols)
+        return x, y
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.num_cols and 0 <= y < self.num_rows
+
+    # True if (x, y) lies inside the grid and is not a block
+    def is_free(self, x, y):
+        return 0 <= x < self.num_cols and 0 <= y < self.num_rows and self.cells[y * self.num_cols + x] != BLOCK
+
+    # Same test for a flat index that is already known to be inside the grid
+    def is_free_index(self, i):
+        return self.cells[i] != BLOCK
+
+    def set_cell(self, x, y, char):
+        if not self.in_bounds(x, y):
+            raise IndexError(f"Cell {(x, y)} is outside the {self.num_rows}x{self.num_cols} grid")
+        self.cells[y * self.num_cols + x] = ord(char)
+        self.changed()
+
+    # Row view so the text and GUI printers can keep using grid[y][x] and len(grid)
+    def __len__(self):
+        return self.num_rows
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.num_rows:
+            raise IndexError("grid row out of range")
+        return GridRow(self, y)
+
+    def __iter__(self):
+        for y in range(self.num_rows):
+            yield GridRow(self, y)
+
+    # Cost of stepping onto (x, y)
+    def cost(self, x, y):
+        return 1 if self.costs is None else self.costs[y * self.num_cols + x]
+
+    # Cheapest and dearest cost of stepping onto a cell, as (min, max)
+    def cost_range(self):
+        if self.cost_bounds is None:
+            self.cost_bounds = (1, 1) if self.costs is None else (min(self.costs), max(self.costs))
+        return self.cost_bounds
+
+    # Total cost of a path: the cost of every cell entered after the first
+    def path_cost(self, path):
+        if self.costs is None:
+            return max(len(path) - 1, 0)
+        return sum(self.cost(x, y) for x, y in path[1:])
+
+    # Hash of the dimensions, obstacle layout and costs; start and goal markers do not affect it
+    def content_hash(self):
+        if self.hash is not None:
+            return self.hash
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.num_rows},{self.num_cols};".encode())
+        digest.update(self.translate(OBSTACLES_ONLY))
+        if self.costs is not None:
+            digest.update(b"costs;")
+            digest.update(self.costs)
+        self.hash = digest.hexdigest()
+        return self.hash
+
+    # Forget the cached content hash and cost range after writing to cells or costs directly
+    def changed(self):
+        self.hash = None
+        self.cost_bounds = None
+
+    # The cells passed through a 256-byte translation table, as bytes
+    def translate(self, table):
+        cells = self.cells
+        return cells.translate(table) if isinstance(cells, bytearray) else bytes(cells).translate(table)
+
+    # Materialize the grid as a list of lists of characters
+    def rows(self):
+        return [list(row) for row in self]
+
+# Read-only view of one grid row, yielding the cell characters
+class GridRow:
+    __slots__ = ('grid', 'offset')
+
+    def __init__(self, grid, y):
+        self.grid = grid
+        self.offset = y * grid.num_cols
+
+    def __len__(self):
+        return self.grid.num_cols
+
+    def __getitem__(self, x):
+        num_cols = self.grid.num_cols
+        if isinstance(x, slice):
+            return [chr(c) for c in self.grid.cells[self.offset:self.offset + num_cols][x]]
+        if not 0 <= x < num_cols:
+            raise IndexError("grid column out of range")
+        return chr(self.grid.cells[self.offset + x])
+
+    def __iter__(self):
+        return iter(self[:])
+
+# Function to create an empty grid with the robot and goal cells marked
+def create_empty_grid(num_rows, num_cols, initial_state, goal_states):
+    grid = GridMap(num_rows, num_cols)
+    grid.set_cell(initial_state[0], initial_state[1], 'R')
+    for goal in goal_states:
+        grid.set_cell(goal[0], goal[1], 'G')
+    return grid
+
+# Function to set one rectangle of a per-cell buffer (the cells or the costs), clipped at the
+# borders, with one slice assignment per row
+def fill_rectangle(grid, buffer, x, y, w, h, value):
+    num_cols = grid.num_cols
+    x0, x1 = max(x, 0), min(x + w, num_cols)
+    y0, y1 = max(y, 0), min(y + h, grid.num_rows)
+    if x0 >= x1 or y0 >= y1:
+        return
+    grid.changed()
+    run = bytes([value]) * (x1 - x0)
+    if x1 - x0 == num_cols:
+        buffer[y0 * num_cols:y1 * num_cols] = run * (y1 - y0)
+        return
+    for row_start in range(y0 * num_cols + x0, y1 * num_cols, num_cols):
+        buffer[row_start:row_start + len(run)] = run
+
+def fill_block(grid, x, y, w, h):
+    fill_rectangle(grid, grid.cells, x, y, w, h, BLOCK)
+
+# Function to give every cell of a rectangle a step cost; later rectangles override earlier ones
+def fill_cost(grid, x, y, w, h, cost):
+    if not 1 <= cost <= MAX_COST:
+        raise ValueError(f"cell costs must be between 1 and {MAX_COST}, got {cost}")
+    if grid.costs is None:
+        grid.costs = bytearray([1]) * (grid.num_rows * grid.num_cols)
+        grid.changed()
+    fill_rectangle(grid, grid.costs, x, y, w, h, cost)
+
+# Function to place blocks on the grid, clipping rectangles at the borders
+def place_blocks(grid, blocks):
+    for x, y, w, h in blocks:
+        fill_block(grid, x, y, w, h)
+
+# Function to yield (line_number, text) for the non-empty lines of a map file, comments removed
+def iter_map_lines(file):
+    for line_number, line in enumerate(file, 1):
+        text = line.split('//')[0].strip()
+        if text:
+            yield line_number, text
+
+NUMBER_PATTERN = re.compile(r'\d+')
+
+# Function to read the numbers of one map line, e.g. '(2,0,2,2)' -> (2, 0, 2, 2).
+# Plain 'x,y' inside parentheses takes the fast path; anything else falls back to a regex.
+# count may be a tuple of accepted counts.
+def parse_numbers(text, count, what, file_path, line_number):
+    try:
+        numbers = tuple(map(int, text.strip().strip('()').split(',')))
+    except ValueError:
+        numbers = tuple(map(int, NUMBER_PATTERN.findall(text)))
+    if len(numbers) not in (count if isinstance(count, tuple) else (count,)):
+        raise ValueError(f"{file_path}, line {line_number}: expected {what}, got '{text}'")
+    return numbers
+
+# Function to read a map file and build its grid, returning (grid, initial_state, goal_states).
+# Compiled maps, and text maps whose compiled copy is up to date, are opened with compiled_map;
+# anything else is parsed as text. With a SearchStats the load is timed into its 'parse' and
+# 'rasterize' phases (opening a compiled map is all 'parse').
+def load_map(file_path, stats=None):
+    from compiled_map import find_compiled, open_compiled
+    began = time.perf_counter()
+    compiled_path = find_compiled(file_path)
+    if compiled_path is None:
+        return load_text_map(file_path, stats)
+    result = open_compiled(compiled_path)
+    if stats is not None:
+        stats.timings['parse'] = time.perf_counter() - began
+    return result
+
+# Function to parse a text map. Block lines are streamed straight into the grid rather than
+# collected first, except when timing with stats, which needs the two phases apart. A line with
+# a fifth number, (x,y,w,h,cost), is not a block but a rectangle whose cells cost that much to
+# step onto (1-255); cells outside every cost rectangle cost 1.
+def load_text_map(file_path, stats=None):
+    began = time.perf_counter()
+    with open(file_path, 'r') as file:
+        lines = iter_map_lines(file)
+        header = [next(lines, None) for _ in range(3)]
+        if header[-1] is None:
+            raise ValueError(f"'{file_path}' needs a size line, a start line and a goal line")
+        numbers = NUMBER_PATTERN.findall(header[0][1])
+        if len(numbers) < 2:
+            raise ValueError("The first line should contain at least two numbers.")
+        num_rows, num_cols = int(numbers[0]), int(numbers[1])
+        initial_state = parse_numbers(header[1][1], 2, "a start cell (x,y)", file_path, header[1][0])
+        goal_states = [parse_numbers(goal, 2, "goal cells (x,y) | (x,y)", file_path, header[2][0])
+                       for goal in header[2][1].split('|')]
+        rectangles = ((line_number, parse_numbers(text, (4, 5), "a block (x,y,w,h) or costs (x,y,w,h,cost)",
+                                                  file_path, line_number))
+                      for line_number, text in lines)
+        if stats is not None:
+            rectangles = list(rectangles)
+            parsed = time.perf_counter()
+            stats.timings['parse'] = parsed - began
+
+        try:
+            grid = create_empty_grid(num_rows, num_cols, initial_state, goal_states)
+        except IndexError as error:
+            raise ValueError(f"{file_path}: {error}") from None
+        for line_number, numbers in rectangles:
+            if len(numbers) == 4:
+                fill_block(grid, *numbers)
+                continue
+            try:
+                fill_cost(grid, *numbers)
+            except ValueError as error:
+                raise ValueError(f"{file_path}, line {line_number}: {error}") from None
+    if stats is not None:
+        stats.timings['rasterize'] = time.perf_counter() - parsed
+    return grid, initial_state, goal_states
+
+# Function to list the block rectangles (x, y, w, h) of a text map in file order, leaving out
+# cost rectangles. Returns None for a compiled map, which only keeps the rasterized cells.
+def read_block_rectangles(file_path):
+    from compiled_map import find_compiled
+    if find_compiled(file_path) == file_path:
+        return None
+    with open(file_path, 'r') as file:
+        lines = iter_map_lines(file)
+        for _ in range(3):
+            next(lines, None)
+        rectangles = (parse_numbers(text, (4, 5), "a block (x,y,w,h) or costs (x,y,w,h,cost)", file_path, line_number)
+                      for line_number, text in lines)
+        return [numbers for numbers in rectangles if len(numbers) == 4]
+
+# Function for the solver scripts: load a map or print the problem and exit
+def read_map_file(file_path, stats=None):
+    try:
+        return load_map(file_path, stats)
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}")
+    sys.exit(1)
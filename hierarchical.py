@@ -0,0 +1,302 @@
+from collections import deque
+from grid_map import BLOCK, FREE
+from open_list import OpenList
+from map_cache import MapCache
+from search_stats import SearchStats
+from goal_index import GoalIndex
+from components import reachable_goals
+
+CLUSTER_SIZE = 16
+# Border openings shorter than this get one entrance in their middle, longer ones one at each end
+LONG_ENTRANCE = 6
+
+# Stands for "any goal" in the abstract graph
+GOAL_NODE = None
+
+# Hierarchical pathfinding (HPA*). The grid is cut into square clusters. Every opening in a
+# cluster border gets one or two entrance pairs, and the entrances of a cluster are joined by
+# their step distance inside it. A query searches this small abstract graph, then turns each
+# abstract edge back into cells with a search limited to one cluster. Paths are close to, but
+# not always, the shortest.
+# Entrances and cluster edges are computed the first time a search reaches them and kept, so
+# a map is only ever analysed once, and only where queries go. After cells change,
+# update_region() drops what the change can affect: the touched clusters' borders and the
+# edges of those clusters and their neighbors. The rest of the map is kept.
+# A query's SearchStats counts the abstract search, the local searches that connect and refine
+# it, and the BFS of every cluster graph it had to build; the builds are also timed as 'build'.
+class HierarchicalMap:
+    def __init__(self, grid, cluster_size=CLUSTER_SIZE):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.clusters_x = (grid.num_cols + cluster_size - 1) // cluster_size
+        self.clusters_y = (grid.num_rows + cluster_size - 1) // cluster_size
+        self.borders = {}  # (cx, cy, axis) -> [(cell, cell across the border), ...]
+        self.graphs = {}  # (cx, cy) -> {entrance: {neighbor: cost}}
+
+    def cluster_of(self, cell):
+        return cell[0] // self.cluster_size, cell[1] // self.cluster_size
+
+    # Function to get the cell rectangle (x0, y0, x1, y1) of a cluster, end-exclusive
+    def bounds(self, cluster):
+        size = self.cluster_size
+        x0, y0 = cluster[0] * size, cluster[1] * size
+        return x0, y0, min(x0 + size, self.grid.num_cols), min(y0 + size, self.grid.num_rows)
+
+    # Entrance pairs on the east (axis 0) or south (axis 1) border of cluster (cx, cy)
+    def border_entrances(self, border):
+        entrances = self.borders.get(border)
+        if entrances is None:
+            entrances = self.scan_border(border)
+            self.borders[border] = entrances
+        return entrances
+
+    def scan_border(self, border):
+        cx, cy, axis = border
+        if (axis == 0 and cx + 1 >= self.clusters_x) or (axis == 1 and cy + 1 >= self.clusters_y):
+            return []
+        x0, y0, x1, y1 = self.bounds((cx, cy))
+        if axis == 0:
+            pairs = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        else:
+            pairs = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+
+        is_free = self.grid.is_free
+        entrances = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and is_free(*pair[0]) and is_free(*pair[1]):
+                run.append(pair)
+                continue
+            if len(run) >= LONG_ENTRANCE:
+                entrances.extend((run[0], run[-1]))
+            elif run:
+                entrances.append(run[len(run) // 2])
+            run = []
+        return entrances
+
+    # Function to get the abstract graph of a cluster: its entrances, each with the step
+    # distance to the other entrances it reaches inside the cluster and cost 1 to its partner
+    # cells across the border
+    def cluster_graph(self, cluster, stats=None):
+        graph = self.graphs.get(cluster)
+        if graph is not None:
+            return graph
+        if stats is None:
+            return self.build_cluster_graph(cluster)
+        with stats.phase('build'):
+            return self.build_cluster_graph(cluster, stats)
+
+    def build_cluster_graph(self, cluster, stats=None):
+        cx, cy = cluster
+        graph = {}
+        for border, side in (((cx, cy, 0), 0), ((cx, cy, 1), 0), ((cx - 1, cy, 0), 1), ((cx, cy - 1, 1), 1)):
+            if border[0] < 0 or border[1] < 0:
+                continue
+            for pair in self.border_entrances(border):
+                graph.setdefault(pair[side], {})[pair[1 - side]] = 1
+
+        entrances = list(graph)
+        for i, entrance in enumerate(entrances):
+            distances, _ = self.cluster_search(cluster, [entrance], stats=stats)
+            for other in entrances[i + 1:]:
+                if other in distances:
+                    graph[entrance][other] = distances[other]
+                    graph[other][entrance] = distances[other]
+        self.graphs[cluster] = graph
+        return graph
+
+    # Function to run a BFS from sources that never leaves cluster. Stops early once target is
+    # reached, or once any cell of the target set is reached. Returns (distances, came_from).
+    def cluster_search(self, cluster, sources, target=None, targets=None, stats=None):
+        x0, y0, x1, y1 = self.bounds(cluster)
+        grid, num_cols = self.grid, self.grid.num_cols
+        distances = {source: 0 for source in sources}
+        came_from = {}
+        queue = deque(distances)
+        if stats is not None:
+            stats.pushes += len(queue)
+        while queue:
+            if stats is not None:
+                stats.open_size(len(queue))
+                stats.pops += 1
+                stats.expansions += 1
+            current = queue.popleft()
+            if current == target or (targets is not None and current in targets):
+                break
+            x, y = current
+            for nx, ny in ((x, y - 1), (x - 1, y), (x, y + 1), (x + 1, y)):
+                if x0 <= nx < x1 and y0 <= ny < y1 and grid.is_free_index(ny * num_cols + nx):
+                    if stats is not None:
+                        stats.generations += 1
+                    if (nx, ny) not in distances:
+                        distances[(nx, ny)] = distances[current] + 1
+                        came_from[(nx, ny)] = current
+                        queue.append((nx, ny))
+                        if stats is not None:
+                            stats.pushes += 1
+        if stats is not None:
+            stats.closed_size(len(distances))
+        return distances, came_from
+
+    # Function to walk came_from back from cell to a source of the search
+    def local_path(self, came_from, cell):
+        path = [cell]
+        while cell in came_from:
+            cell = came_from[cell]
+            path.append(cell)
+        path.reverse()
+        return path
+
+    # Function to find a path from start to the nearest goal. Returns the cell path, start and
+    # goal inclusive, or [] when no goal can be reached.
+    def find_path(self, start, goal_states, trace=None, stats=None):
+        stats = stats if stats is not None else SearchStats('hpa')
+        start = tuple(start)
+        goal_states = reachable_goals(self.grid, start, goal_states)
+        if not goal_states:
+            return []
+        goals = GoalIndex(self.grid, goal_states)
+        if start in goals:
+            return [start]
+
+        # Connect the start to the entrances of its cluster, and every entrance (and the start)
+        # of a cluster holding goals to the goal node, at its distance to the nearest of them
+        start_cluster = self.cluster_of(start)
+        start_distances, _ = self.cluster_search(start_cluster, [start], stats=stats)
+        start_edges = {entrance: start_distances[entrance] for entrance in self.cluster_graph(start_cluster, stats)
+                       if entrance in start_distances and entrance != start}
+        goal_clusters = {}
+        for goal in goals:
+            goal_clusters.setdefault(self.cluster_of(goal), []).append(goal)
+        goal_costs = {}
+        for cluster, cluster_goals in goal_clusters.items():
+            distances, _ = self.cluster_search(cluster, cluster_goals, stats=stats)
+            nodes = list(self.cluster_graph(cluster, stats))
+            if cluster == start_cluster:
+                nodes.append(start)
+            for node in nodes:
+                if node in distances:
+                    goal_costs[node] = distances[node]
+
+        def successors(node):
+            if node == start:
+                yield from start_edges.items()
+            yield from self.cluster_graph(self.cluster_of(node), stats).get(node, {}).items()
+            if node in goal_costs:
+                yield GOAL_NODE, goal_costs[node]
+
+        # A* over the abstract graph
+        open_set = OpenList()
+        open_set.push(start, goals.nearest_distance(start))
+        stats.pushes += 1
+        g_score = {start: 0}
+        came_from = {}
+        while open_set:
+            stats.open_size(len(open_set))
+            current = open_set.pop()
+            stats.pops += 1
+            if current is GOAL_NODE:
+                break
+            stats.expansions += 1
+            if trace:
+                trace.expand(current)
+            for neighbor, cost in successors(current):
+                stats.generations += 1
+                tentative_g_score = g_score[current] + cost
+                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                    if neighbor in g_score and neighbor not in open_set:
+                        stats.reexpansions += 1  # Already expanded: reopened with a better g
+                    g_score[neighbor] = tentative_g_score
+                    came_from[neighbor] = current
+                    heuristic = 0 if neighbor is GOAL_NODE else goals.nearest_distance(neighbor)
+                    open_set.push(neighbor, tentative_g_score + heuristic)
+                    stats.pushes += 1
+                    if trace and neighbor is not GOAL_NODE:
+                        trace.push(neighbor)
+        stats.closed_size(len(g_score))
+        if GOAL_NODE not in came_from:
+            return []
+
+        abstract_path = [came_from[GOAL_NODE]]
+        while abstract_path[-1] in came_from:
+            abstract_path.append(came_from[abstract_path[-1]])
+        abstract_path.reverse()
+        with stats.phase('reconstruct'):
+            return self.refine(abstract_path, goals, stats)
+
+    # Function to turn the abstract path (ending at the entrance next to the goal) into cells
+    def refine(self, abstract_path, goals, stats=None):
+        path = [abstract_path[0]]
+        for a, b in zip(abstract_path, abstract_path[1:]):
+            if abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1:
+                path.append(b)
+                continue
+            _, came_from = self.cluster_search(self.cluster_of(a), [a], target=b, stats=stats)
+            path.extend(self.local_path(came_from, b)[1:])
+
+        last = path[-1]
+        distances, came_from = self.cluster_search(self.cluster_of(last), [last], targets=goals, stats=stats)
+        goal = min((cell for cell in distances if cell in goals), key=distances.get)
+        path.extend(self.local_path(came_from, goal)[1:])
+        return path
+
+    # Function to call after cells inside the rectangle changed; forgets the entrances on the
+    # borders of every touched cluster and the edges of those clusters and their neighbors
+    def update_region(self, x, y, w, h):
+        size = self.cluster_size
+        first_x, last_x = max(x, 0) // size, min(x + w - 1, self.grid.num_cols - 1) // size
+        first_y, last_y = max(y, 0) // size, min(y + h - 1, self.grid.num_rows - 1) // size
+        for cy in range(first_y, last_y + 1):
+            for cx in range(first_x, last_x + 1):
+                for border in ((cx, cy, 0), (cx, cy, 1), (cx - 1, cy, 0), (cx, cy - 1, 1)):
+                    self.borders.pop(border, None)
+                for cluster in ((cx, cy), (cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+                    self.graphs.pop(cluster, None)
+
+# LRU cache of hierarchies keyed by the map's content hash
+class HierarchyCache(MapCache):
+    def build(self, grid):
+        return HierarchicalMap(grid)
+
+    def get(self, grid):
+        hierarchy = super().get(grid)
+        hierarchy.grid = grid  # same obstacles, but the grid it was built from may have changed since
+        return hierarchy
+
+    # Function to write new codes into cells of grid, given as {cell: code}. The grid's cached
+    # hierarchy, if it has one, is updated with update_region() over the changed cells and filed
+    # under the new content hash, so the next query rebuilds only the clusters around the change.
+    def write_cells(self, grid, changes):
+        if not changes:
+            return
+        hierarchy = self.entries.pop(grid.content_hash(), None)
+        for (x, y), code in changes.items():
+            grid.cells[grid.index(x, y)] = code
+        grid.changed()
+        if hierarchy is None:
+            return
+        xs = [x for x, _ in changes]
+        ys = [y for _, y in changes]
+        hierarchy.update_region(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+        hierarchy.grid = grid
+        self.store(grid.content_hash(), hierarchy)
+
+    # Block a rectangle of grid, clipped at the borders; returns the number of cells that changed
+    def add_block(self, grid, x, y, w, h):
+        changes = {cell: BLOCK for cell in rectangle_cells(grid, x, y, w, h) if grid.is_free(*cell)}
+        self.write_cells(grid, changes)
+        return len(changes)
+
+    # Free the blocked cells of a rectangle of grid; returns the number of cells that changed
+    def remove_block(self, grid, x, y, w, h):
+        changes = {cell: FREE for cell in rectangle_cells(grid, x, y, w, h) if not grid.is_free(*cell)}
+        self.write_cells(grid, changes)
+        return len(changes)
+
+# Function to list the cells of a rectangle that lie inside the grid
+def rectangle_cells(grid, x, y, w, h):
+    return [(cx, cy) for cy in range(max(y, 0), min(y + h, grid.num_rows))
+            for cx in range(max(x, 0), min(x + w, grid.num_cols))]
+
+# Shared cache used by the solvers
+hierarchy_cache = HierarchyCache()
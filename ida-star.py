@@ -1,131 +1,147 @@
 import sys
-import re
-import tkinter as tk
 import time
+from grid_map import read_map_file
+from goal_index import GoalIndex
+from components import reachable_goals
+from search_trace import TraceWriter, split_trace_option
+from search_stats import SearchStats, split_stats_option
+from grid_canvas import GridCanvas, BASE
 
 # Global variables for GUI
 window = None
-grid_frame = None
-cell_frames = []  # Store references to cell frames
-visited_nodes = set()
-
-def read_input_file(file_path):
-    try:
-        with open(file_path, 'r') as file:
-            content = file.readlines()
-        content = [line.split('//')[0].strip() for line in content if line.strip() and not line.strip().startswith('//')]
-        return content
-    except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
-        sys.exit(1)
+view = None  # GridCanvas while the GUI is shown
 
-def extract_grid_dimensions(line):
-    numbers = re.findall(r'\d+', line)
-    if len(numbers) >= 2:
-        return int(numbers[0]), int(numbers[1])
-    else:
-        print("Error: The first line should contain at least two numbers.")
-        sys.exit(1)
+# Cell colors, highest priority first; BASE is the map's walls, start and goals
+GUI_LAYERS = [('path', 'orange'), BASE]
+
+# Neighbor order used by the search: left, up, right, down
+DIRECTIONS = [(-1, 0), (0, -1), (1, 0), (0, 1)]
+
+TRANSPOSITION_TABLE_SIZE = 1 << 20  # most cells whose best g is remembered per iteration
 
-def create_empty_grid(num_rows, num_cols, initial_state, goal_states):
-    grid = [['-' for _ in range(num_cols)] for _ in range(num_rows)]
-    grid[initial_state[1]][initial_state[0]] = 'R'
-    for goal in goal_states:
-        grid[goal[1]][goal[0]] = 'G'
-    return grid
-
-def place_blocks(grid, blocks):
-    for block in blocks:
-        x, y, w, h = block
-        for i in range(h):
-            for j in range(w):
-                if 0 <= y+i < len(grid) and 0 <= x+j < len(grid[0]):
-                    grid[y+i][x+j] = 'X'
-
-def manhattan_distance(pos, goal):
-    return abs(pos[0] - goal[0]) + abs(pos[1] - goal[1])
-
-def ida_star(grid, start, goals, use_gui=False):
+def ida_star(grid, start, goals, use_gui=False, trace=None, table_size=TRANSPOSITION_TABLE_SIZE, stats=None):
+    stats = stats if stats is not None else SearchStats('ida')
     path = []
-    threshold = min(manhattan_distance(start, goal) for goal in goals)
+    goals = reachable_goals(grid, start, goals)  # Goals walled off from the start are dropped
+    if not goals:
+        return []
+    goals = GoalIndex(grid, goals)  # Goal bitmap and nearest-goal distance lookup, shared by every pass
+    threshold = goals.nearest_distance(start)
     
     while True:
-        temp, path = search(start, 0, threshold, grid, goals, [start], {start}, use_gui)
+        stats.iterations += 1
+        temp, path = search(start, threshold, grid, goals, use_gui, trace, table_size, stats)
         if temp == "FOUND":
+            if trace:
+                trace.path_found(path)
             return path
         if temp == float('inf'):
             return []
         threshold = temp
 
-def search(node, g, threshold, grid, goals, path, visited, use_gui):
-    global visited_nodes
-    visited_nodes.add(node)  # Track visited nodes globally
-    f = g + min(manhattan_distance(node, goal) for goal in goals)
+# One depth-first pass bounded by threshold, run on an explicit stack so long corridors cannot
+# hit the recursion limit. The path is a single shared buffer: g is its length minus one and
+# dir_index holds the next neighbor to try for each cell on it. The transposition table keeps
+# the smallest g at which each cell was entered during this pass; arriving again with an equal
+# or larger g cannot lead anywhere new, so that branch is pruned.
+def search(start, threshold, grid, goals, use_gui, trace=None, table_size=TRANSPOSITION_TABLE_SIZE, stats=None):
+    stats = stats if stats is not None else SearchStats('ida')
+    if not isinstance(goals, GoalIndex):
+        goals = GoalIndex(grid, goals)
+    stats.generations += 1
+    f = goals.nearest_distance(start)
     if f > threshold:
-        return f, path
-    if node in goals:
+        return f, []
+    if start in goals:
         if use_gui:
-            update_gui(grid, path=path + [node], current=node, use_gui=use_gui)
-        return "FOUND", path
-    min_threshold = float('inf')
-
+            update_gui(grid, path=[start], current=start, use_gui=use_gui)
+        return "FOUND", [start]
+    stats.expansions += 1
+    stats.pushes += 1
+    if trace:
+        trace.expand(start)
     if use_gui:
-        update_gui(grid, path=path, current=node, use_gui=use_gui)
+        update_gui(grid, path=[start], current=start, use_gui=use_gui)
         time.sleep(0.05)
 
-    for dx, dy in [(-1, 0), (0, -1), (1, 0), (0, 1)]:
-        x, y = node[0] + dx, node[1] + dy
-        if 0 <= x < len(grid[0]) and 0 <= y < len(grid) and grid[y][x] != 'X' and (x, y) not in visited:
-            visited.add((x, y))
-            temp, new_path = search((x, y), g + 1, threshold, grid, goals, path + [(x, y)], visited, use_gui)
-            if temp == "FOUND":
-                return "FOUND", new_path
-            if temp < min_threshold:
-                min_threshold = temp
-            visited.remove((x, y))  # Backtrack: remove from visited if not leading to a solution
+    path = [start]
+    dir_index = [0]
+    on_path = {start}
+    best_g = {start: 0}
+    min_threshold = float('inf')
 
-    return min_threshold, path
+    while path:
+        node = path[-1]
+        k = dir_index[-1]
+        if k == 4:
+            # Every neighbor tried: backtrack
+            path.pop()
+            dir_index.pop()
+            on_path.remove(node)
+            stats.pops += 1
+            if trace:
+                trace.pop(node)
+            continue
+        dir_index[-1] = k + 1
+        dx, dy = DIRECTIONS[k]
+        neighbor = (node[0] + dx, node[1] + dy)
+        if neighbor in on_path or not grid.is_free(neighbor[0], neighbor[1]):
+            continue
+
+        stats.generations += 1
+        g = len(path)
+        f = g + goals.nearest_distance(neighbor)
+        if f > threshold:
+            if f < min_threshold:
+                min_threshold = f
+            continue
+        seen_g = best_g.get(neighbor)
+        if seen_g is not None and seen_g <= g:
+            continue
+        if seen_g is not None or len(best_g) < table_size:
+            best_g[neighbor] = g
+
+        path.append(neighbor)
+        dir_index.append(0)
+        on_path.add(neighbor)
+        stats.pushes += 1
+        stats.open_size(len(path))
+        if trace:
+            trace.push(neighbor)
+        if neighbor in goals:
+            stats.closed_size(len(best_g))
+            if use_gui:
+                update_gui(grid, path=path, current=neighbor, use_gui=use_gui)
+            return "FOUND", list(path)
+        stats.expansions += 1
+        if seen_g is not None:
+            stats.reexpansions += 1  # Entered again this pass by a shorter route
+        if trace:
+            trace.expand(neighbor)
+        if use_gui:
+            update_gui(grid, path=path, current=neighbor, use_gui=use_gui)
+            time.sleep(0.05)
+
+    stats.closed_size(len(best_g))
+    return min_threshold, []
 
 def init_gui(grid):
-    global window, grid_frame, cell_frames
+    global window, view
+    import tkinter as tk
     window = tk.Tk()
     window.title("IDA* Pathfinding")
-    grid_frame = tk.Frame(window)
-    grid_frame.pack()
-
-    cell_frames = [[None for _ in range(len(grid[0]))] for _ in range(len(grid))]  # Initialize cell frame references
-    cell_size = 50
-    for y in range(len(grid)):
-        row = []
-        for x in range(len(grid[0])):
-            color = 'white'
-            cell = tk.Frame(grid_frame, width=cell_size, height=cell_size, bg=color, borderwidth=1, relief="solid")
-            cell.grid(row=y, column=x)
-            row.append(cell)
-        cell_frames[y] = row
+    view = GridCanvas(grid, window, GUI_LAYERS)
     update_gui(grid, use_gui=True)  # Initial grid setup
 
 def update_gui(grid, path=[], current=None, use_gui=False):
-    if not use_gui or grid_frame is None:
+    if not use_gui or view is None:
         return  # Skip GUI update if not in GUI mode
-    for y in range(len(grid)):
-        for x in range(len(grid[0])):
-            color = 'white'
-            if grid[y][x] == 'X':
-                color = 'black'
-            elif (x, y) in path:
-                color = 'orange'
-            elif grid[y][x] == 'G':
-                color = 'green'
-            elif grid[y][x] == 'R':
-                color = 'blue'
-            cell_frames[y][x].config(bg=color)
-    window.update_idletasks()
-    window.update()
+    view.set_layer('path', path)
+    view.render(force=current is None)  # Final paths are always drawn
     time.sleep(0.3)  # Adjust the sleep time as needed for visualization
 
 def print_grid_with_path(grid, path):
-    grid_copy = [row[:] for row in grid]  # Make a copy of the grid
+    grid_copy = grid.rows()  # Make a text copy of the grid
     for x, y in path:
         grid_copy[y][x] = 'P'  # Mark the path on the grid
     for row in grid_copy:
@@ -140,41 +156,42 @@ def format_directions(path):
         directions.append(direction_symbols.get((dx, dy), 'unknown'))
     return '; '.join(directions)
 
-def main(file_path, use_gui=False):
-    content = read_input_file(file_path)
-    if content is None:
-        sys.exit(1)
-
-    num_rows, num_cols = extract_grid_dimensions(content[0])
-    initial_state = tuple(map(int, re.findall(r'\d+', content[1])))
-    goal_states = [tuple(map(int, re.findall(r'\d+', x))) for x in content[2].split('|')]
-    blocks = [tuple(map(int, re.findall(r'\d+', x))) for x in content[3:]]
-
-    grid = create_empty_grid(num_rows, num_cols, initial_state, goal_states)
-    place_blocks(grid, blocks)
+def main(file_path, use_gui=False, trace_path=None, show_stats=False):
+    stats = SearchStats('ida')
+    grid, initial_state, goal_states = read_map_file(file_path, stats)
+    trace = TraceWriter(trace_path, grid) if trace_path else None
 
     if use_gui:
         init_gui(grid)
-    path = ida_star(grid, initial_state, set(goal_states), use_gui)
-
-    if path:
-        directions = format_directions(path)
-        print("Path found:", path)
-        print(f"Goal node: {goal_states[0]}")
-        print(f"Nodes visited: {len(visited_nodes)}")
-        print(f"Direction path: {directions}")
-        if use_gui:
-            update_gui(grid, path=path, use_gui=use_gui)
-            window.mainloop()
-    else:
-        print("No path found.")
+    with stats.phase('search'):
+        path = ida_star(grid, initial_state, set(goal_states), use_gui, trace, stats=stats)
+    if trace:
+        trace.close()
+
+    with stats.phase('render'):
+        if path:
+            directions = format_directions(path)
+            print("Path found:", path)
+            print(f"Goal node: {goal_states[0]}")
+            print(f"Nodes visited: {stats.expansions}")
+            print(f"Direction path: {directions}")
+            if use_gui:
+                update_gui(grid, path=path, use_gui=use_gui)
+        else:
+            print("No path found.")
+    if show_stats:
+        print(stats.to_json())
+    if path and use_gui:
+        window.mainloop()
 
 if __name__ == "__main__":
-    use_gui = '--gui' in sys.argv
-    args = [arg for arg in sys.argv[1:] if arg != '--gui']
+    trace_path, argv = split_trace_option(sys.argv)
+    show_stats, argv = split_stats_option(argv)
+    use_gui = '--gui' in argv
+    args = [arg for arg in argv[1:] if arg != '--gui']
 
     if len(args) != 1:
-        print("Usage: python3 ida_star.py <file_path> [--gui]")
+        print("Usage: python3 ida_star.py <file_path> [--gui] [--trace <trace_file>] [--stats]")
         sys.exit(1)
 
-    main(args[0], use_gui)
+    main(args[0], use_gui, trace_path, show_stats)
@@ -0,0 +1,210 @@
+import sys
+from array import array
+from collections import Counter
+from grid_map import FREE, BLOCK, GOAL, read_map_file, read_block_rectangles
+from open_list import OpenList
+from hierarchical import hierarchy_cache
+
+INF = float('inf')
+
+# Neighbor order used when walking the path: up, left, down, right
+DIRECTIONS = [(0, -1), (-1, 0), (0, 1), (1, 0)]
+
+# Incremental planner (D* Lite) for grids whose blocks change while the robot moves.
+# The search runs backwards from every goal, so g holds each cell's distance to the nearest
+# goal. After blocks are added or removed only the cells whose distance changed are
+# expanded again, and a robot that moved keeps all previous work through the key modifier km.
+# The planner edits the grid it is given when blocks change.
+# blocks are the rectangles the grid's blocks were drawn from, e.g. the map file's block lines.
+# Without them every cell blocked at the start counts as its own 1x1 rectangle. A cell is only
+# freed once no rectangle added and not yet removed covers it.
+class IncrementalPlanner:
+    def __init__(self, grid, start, goal_states, blocks=None):
+        self.grid = grid
+        self.start = tuple(start)
+        self.goals = set(tuple(goal) for goal in goal_states)
+        self.blocks = Counter()  # rectangle -> times it was added
+        self.coverage = array('I', [0]) * (grid.num_rows * grid.num_cols)  # rectangles covering each cell
+        if blocks is None:
+            blocks = [grid.coords(i) + (1, 1) for i in range(grid.num_rows * grid.num_cols) if grid.cells[i] == BLOCK]
+        for block in blocks:
+            block = tuple(block)
+            self.blocks[block] += 1
+            self.cover(*block, 1)
+        self.g = {}
+        self.rhs = {}
+        self.km = 0
+        self.open_list = OpenList()
+        self.expansions = 0  # cells expanded by the last plan() call
+        self.total_expansions = 0
+        for goal in self.goals:
+            if grid.is_free(goal[0], goal[1]):
+                self.rhs[goal] = 0
+                self.open_list.push(goal, self.calculate_key(goal))
+
+    def heuristic(self, cell):
+        return abs(cell[0] - self.start[0]) + abs(cell[1] - self.start[1])
+
+    def calculate_key(self, cell):
+        best = min(self.g.get(cell, INF), self.rhs.get(cell, INF))
+        return (best + self.heuristic(cell) + self.km, best)
+
+    def neighbors(self, cell):
+        x, y = cell
+        grid = self.grid
+        return [(x + dx, y + dy) for dx, dy in DIRECTIONS if grid.in_bounds(x + dx, y + dy)]
+
+    # Recompute rhs of cell from its neighbors and requeue it if it is inconsistent
+    def update_vertex(self, cell):
+        grid = self.grid
+        if not grid.is_free(cell[0], cell[1]):
+            rhs = INF
+        elif cell in self.goals:
+            rhs = 0
+        else:
+            g = self.g
+            rhs = min((g.get(neighbor, INF) for neighbor in self.neighbors(cell)
+                       if grid.is_free(neighbor[0], neighbor[1])), default=INF) + 1
+        self.rhs[cell] = rhs
+        if cell in self.open_list:
+            self.open_list.remove(cell)
+        if self.g.get(cell, INF) != rhs:
+            self.open_list.push(cell, self.calculate_key(cell))
+
+    def compute_shortest_path(self):
+        open_list, g, rhs = self.open_list, self.g, self.rhs
+        expansions = 0
+        while open_list:
+            start_key = self.calculate_key(self.start)
+            if open_list.peek_priority() >= start_key and rhs.get(self.start, INF) == g.get(self.start, INF):
+                break
+            old_key = open_list.peek_priority()
+            cell = open_list.pop()
+            new_key = self.calculate_key(cell)
+            if old_key < new_key:
+                open_list.push(cell, new_key)
+                continue
+            expansions += 1
+            if g.get(cell, INF) > rhs.get(cell, INF):
+                g[cell] = rhs[cell]
+            else:
+                g[cell] = INF
+                self.update_vertex(cell)
+            for neighbor in self.neighbors(cell):
+                self.update_vertex(neighbor)
+        self.expansions = expansions
+        self.total_expansions += expansions
+
+    # Function to change the cells of a rectangle and repair the affected part of the search.
+    # The grid is written through the hierarchy cache, so a cached HPA* hierarchy of it is
+    # updated for just the clusters around the rectangle instead of being rebuilt.
+    def set_rectangle(self, x, y, w, h, blocked):
+        grid = self.grid
+        changed = {}
+        for cy in range(max(y, 0), min(y + h, grid.num_rows)):
+            for cx in range(max(x, 0), min(x + w, grid.num_cols)):
+                i = grid.index(cx, cy)
+                if blocked:
+                    if grid.cells[i] != BLOCK:
+                        changed[(cx, cy)] = BLOCK
+                elif grid.cells[i] == BLOCK and not self.covered(cx, cy):
+                    changed[(cx, cy)] = GOAL if (cx, cy) in self.goals else FREE
+        hierarchy_cache.write_cells(grid, changed)
+        for cell in changed:
+            self.update_vertex(cell)
+            for neighbor in self.neighbors(cell):
+                self.update_vertex(neighbor)
+        return len(changed)
+
+    # Count a rectangle in (delta 1) or out of (delta -1) the coverage of its cells
+    def cover(self, x, y, w, h, delta):
+        grid, coverage = self.grid, self.coverage
+        for cy in range(max(y, 0), min(y + h, grid.num_rows)):
+            for i in range(grid.index(max(x, 0), cy), grid.index(min(x + w, grid.num_cols), cy)):
+                coverage[i] += delta
+
+    # Whether any known rectangle still covers cell
+    def covered(self, x, y):
+        return self.coverage[self.grid.index(x, y)] > 0
+
+    # Add a block rectangle; returns the number of cells that became blocked
+    def add_block(self, x, y, w, h):
+        self.blocks[(x, y, w, h)] += 1
+        self.cover(x, y, w, h, 1)
+        return self.set_rectangle(x, y, w, h, True)
+
+    # Remove a block rectangle; cells another known rectangle still covers stay blocked, and
+    # a rectangle that was never added frees nothing. Returns the number of cells that became free.
+    def remove_block(self, x, y, w, h):
+        if not self.blocks[(x, y, w, h)]:
+            return 0
+        self.blocks[(x, y, w, h)] -= 1
+        if not self.blocks[(x, y, w, h)]:
+            del self.blocks[(x, y, w, h)]
+        self.cover(x, y, w, h, -1)
+        return self.set_rectangle(x, y, w, h, False)
+
+    # Tell the planner the robot is now at cell. Queued keys were computed for the old start;
+    # raising km by the distance moved keeps them valid lower bounds instead of rebuilding them.
+    def move_start(self, cell):
+        cell = tuple(cell)
+        self.km += self.heuristic(cell)
+        self.start = cell
+
+    # Function to bring the search up to date and return the path from the start to the
+    # nearest goal, or [] if no goal can be reached
+    def plan(self):
+        self.compute_shortest_path()
+        g = self.g
+        current = self.start
+        if g.get(current, INF) == INF:
+            return []
+        path = [current]
+        while current not in self.goals:
+            current = min((neighbor for neighbor in self.neighbors(current)
+                           if self.grid.is_free(neighbor[0], neighbor[1])),
+                          key=lambda neighbor: g.get(neighbor, INF))
+            path.append(current)
+        return path
+
+# Reads change commands from stdin and prints the new plan after each one:
+#   + (x,y,w,h)   add a block        - (x,y,w,h)   remove a block        @ (x,y)   move the robot
+# Removing a rectangle, one of the map file's or one added here, frees the cells of it that no
+# other rectangle still covers.
+def main(file_path):
+    grid, initial_state, goal_states = read_map_file(file_path)
+    planner = IncrementalPlanner(grid, initial_state, goal_states, read_block_rectangles(file_path))
+
+    def report():
+        path = planner.plan()
+        if path:
+            print(f"Path of {len(path) - 1} steps to {path[-1]}, {planner.expansions} cells expanded")
+        else:
+            print(f"No path found, {planner.expansions} cells expanded")
+
+    report()
+    for line in sys.stdin:
+        line = line.split('//')[0].strip()
+        if not line:
+            continue
+        try:
+            numbers = [int(number) for number in line[1:].strip().strip('()').split(',')]
+        except ValueError:
+            numbers = []
+        if line[0] in '+-' and len(numbers) == 4:
+            if line[0] == '+':
+                planner.add_block(*numbers)
+            else:
+                planner.remove_block(*numbers)
+        elif line[0] == '@' and len(numbers) == 2:
+            planner.move_start(tuple(numbers))
+        else:
+            print(f"Error: Could not read change '{line}'")
+            continue
+        report()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python incremental_planner.py <file_path> < changes")
+        sys.exit(1)
+    main(sys.argv[1])
@@ -0,0 +1,124 @@
+from open_list import OpenList
+from search_stats import SearchStats
+
+# Jump Point Search adapted to 4-connected, uniform-cost grids.
+# Shortest paths are made canonical by moving horizontally first and vertically second, so:
+#  - a horizontal jump may turn up or down at any cell, and stops at a cell from which a
+#    vertical jump would reach a goal or a forced cell;
+#  - a vertical jump only continues straight, and stops at a goal or at a forced cell, i.e.
+#    one whose side neighbor is free while the side neighbor of the cell before it is blocked
+#    (the canonical path around that block has to turn here).
+# A* then runs over jump points only, with straight segments costing their Manhattan length.
+
+# Function to jump vertically from (x, y); returns the jump point or None
+def jump_vertical(grid, x, y, dy, goals):
+    while True:
+        y += dy
+        if not grid.is_free(x, y):
+            return None
+        if (x, y) in goals:
+            return (x, y)
+        if ((grid.is_free(x - 1, y) and not grid.is_free(x - 1, y - dy)) or
+                (grid.is_free(x + 1, y) and not grid.is_free(x + 1, y - dy))):
+            return (x, y)
+
+# Function to jump horizontally from (x, y); returns the jump point or None
+def jump_horizontal(grid, x, y, dx, goals):
+    while True:
+        x += dx
+        if not grid.is_free(x, y):
+            return None
+        if (x, y) in goals:
+            return (x, y)
+        if jump_vertical(grid, x, y, -1, goals) or jump_vertical(grid, x, y, 1, goals):
+            return (x, y)
+
+# Function to list the jump points reachable from node, pruning by the direction it was entered from
+def jump_successors(grid, node, parent, goals):
+    x, y = node
+    if parent is None:
+        directions = [(0, -1), (-1, 0), (0, 1), (1, 0)]
+    elif parent[1] == y:
+        dx = 1 if x > parent[0] else -1
+        directions = [(0, -1), (dx, 0), (0, 1)]
+    else:
+        dy = 1 if y > parent[1] else -1
+        directions = [(0, dy)]
+        for side in (-1, 1):
+            if grid.is_free(x + side, y) and not grid.is_free(x + side, y - dy):
+                directions.append((side, 0))
+
+    successors = []
+    for dx, dy in directions:
+        if dy == 0:
+            jump_point = jump_horizontal(grid, x, y, dx, goals)
+        else:
+            jump_point = jump_vertical(grid, x, y, dy, goals)
+        if jump_point is not None:
+            successors.append(jump_point)
+    return successors
+
+# Function to turn the jump-point parent chain ending at goal into unit-step came_from links
+def expand_jump_path(parents, goal):
+    came_from = {}
+    current = goal
+    while parents[current] is not None:
+        previous = parents[current]
+        step_x = (previous[0] > current[0]) - (previous[0] < current[0])
+        step_y = (previous[1] > current[1]) - (previous[1] < current[1])
+        cell = current
+        while cell != previous:
+            next_cell = (cell[0] + step_x, cell[1] + step_y)
+            came_from[cell] = next_cell
+            cell = next_cell
+        current = previous
+    return came_from
+
+# Function to perform the search. Returns (goal, came_from, expansions); goal is None when no
+# goal is reachable. came_from holds unit steps along the found path only. The counters in
+# stats are per jump point: generations counts the jump points found from an expanded one.
+def jump_point_search(grid, start, goal_states, trace=None, stats=None):
+    stats = stats if stats is not None else SearchStats('jps')
+    goals = set(goal_states)
+
+    def heuristic(cell):
+        return min(abs(cell[0] - goal[0]) + abs(cell[1] - goal[1]) for goal in goals)
+
+    if not goals:
+        return None, {}, 0
+    open_set = OpenList()
+    open_set.push(start, heuristic(start))
+    stats.pushes += 1
+    if trace:
+        trace.push(start)
+    g_score = {start: 0}
+    parents = {start: None}
+    expansions = 0
+
+    while open_set:
+        stats.open_size(len(open_set))
+        current = open_set.pop()
+        stats.pops += 1
+        stats.expansions += 1
+        expansions += 1
+        if trace:
+            trace.expand(current)
+        if current in goals:
+            stats.closed_size(len(g_score))
+            return current, expand_jump_path(parents, current), expansions
+
+        for jump_point in jump_successors(grid, current, parents[current], goals):
+            stats.generations += 1
+            tentative_g_score = g_score[current] + abs(jump_point[0] - current[0]) + abs(jump_point[1] - current[1])
+            if jump_point not in g_score or tentative_g_score < g_score[jump_point]:
+                if jump_point in g_score and jump_point not in open_set:
+                    stats.reexpansions += 1  # Already expanded: reopened with a better g
+                g_score[jump_point] = tentative_g_score
+                parents[jump_point] = current
+                open_set.push(jump_point, tentative_g_score + heuristic(jump_point))
+                stats.pushes += 1
+                if trace:
+                    trace.push(jump_point)
+
+    stats.closed_size(len(g_score))
+    return None, {}, expansions
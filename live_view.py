@@ -0,0 +1,248 @@
+import sys
+import time
+import queue
+import argparse
+import threading
+from grid_map import load_map
+from grid_canvas import GridCanvas, BASE
+from solvers import SOLVERS, solve, prepare_solver
+from search_trace import EXPAND, PUSH, POP, PATH, EXPAND_BACKWARD, PUSH_BACKWARD, EVENT_NAMES
+
+# Live search view: the solver runs headless on a worker thread and the Tk main loop only
+# draws. The worker gets a LiveTrace as its trace sink, which keeps the last event of each
+# cell changed since the previous hand-off in a delta dict and passes deltas to the GUI over a
+# bounded queue. When the queue is full the worker does not wait: it keeps merging events into
+# the same delta, so a slow window costs the search nothing and catches up with one redraw.
+# Only when it is about to stop, on a pause or at the end, does it wait for room in the queue,
+# in short timeouts so a window that was closed meanwhile cannot keep it waiting.
+
+FRAME_MS = 30
+FLUSH_INTERVAL = 0.02  # seconds between deltas handed to the GUI
+QUEUE_SIZE = 8
+PUT_TIMEOUT = 0.1  # seconds between checks for a closed window while waiting for room in the queue
+
+# Cell colors per event, as in replay.py; a cell is in the layer of its last event
+GUI_LAYERS = [('path', 'yellow'), BASE, ('expand-backward', 'pink'), ('push-backward', 'light blue'),
+              ('expand', 'light grey'), ('push', 'orange'), ('pop', '#f5f5dc')]
+
+class SearchCancelled(Exception):
+    pass
+
+# Trace sink for the worker thread. Pausing, single steps and the speed limit are applied at
+# each expansion; speed is in expansions per second, 0 for no limit.
+class LiveTrace:
+    def __init__(self, deltas, speed=0):
+        self.deltas = deltas
+        self.delta = {}  # cell -> last event since the previous hand-off
+        self.last_flush = time.perf_counter()
+        self.speed = speed
+        self.next_time = 0.0
+        self.running = threading.Event()
+        self.running.set()
+        self.single_step = False
+        self.cancelled = False
+        self.expansions = 0
+
+    def wait_turn(self):
+        if not self.running.is_set():
+            if self.delta:
+                self.hand_over(('delta', self.delta))  # show everything up to the pause
+                self.delta = {}
+            self.running.wait()
+        if self.cancelled:
+            raise SearchCancelled()
+        if self.single_step:
+            self.single_step = False
+            self.running.clear()
+        self.expansions += 1
+        now = time.perf_counter()
+        speed = self.speed  # read once, the GUI thread may change it
+        if speed > 0:
+            if self.next_time > now:
+                time.sleep(self.next_time - now)
+            self.next_time = max(now, self.next_time) + 1.0 / speed
+        if now - self.last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    # Hand the delta to the GUI, or keep merging into it while the queue is full
+    def flush(self):
+        if not self.delta:
+            return
+        try:
+            self.deltas.put_nowait(('delta', self.delta))
+        except queue.Full:
+            return
+        self.delta = {}
+        self.last_flush = time.perf_counter()
+
+    def expand(self, cell):
+        self.wait_turn()
+        self.delta[cell] = EXPAND
+
+    def push(self, cell):
+        self.delta[cell] = PUSH
+
+    def pop(self, cell):
+        self.delta[cell] = POP
+
+    def expand_backward(self, cell):
+        self.wait_turn()
+        self.delta[cell] = EXPAND_BACKWARD
+
+    def push_backward(self, cell):
+        self.delta[cell] = PUSH_BACKWARD
+
+    def path_found(self, path):
+        for cell in path:
+            self.delta[cell] = PATH
+
+    # Put a message on the queue, waiting for room until it fits or the view is closed
+    def hand_over(self, message):
+        while not self.cancelled:
+            try:
+                self.deltas.put(message, timeout=PUT_TIMEOUT)
+                self.last_flush = time.perf_counter()
+                return
+            except queue.Full:
+                pass
+
+    # Called by the worker when the search ends; the last delta and the result always get through
+    def finish(self, result):
+        if self.delta:
+            self.hand_over(('delta', self.delta))
+            self.delta = {}
+        self.hand_over(result)
+
+    def cancel(self):
+        self.cancelled = True
+        self.running.set()
+
+class LiveView:
+    def __init__(self, grid, start, goal_states, algorithm, options=None, speed=50):
+        import tkinter as tk
+        self.grid = grid
+        self.state = {}  # cell -> last event drawn
+        self.deltas = queue.Queue(QUEUE_SIZE)
+        self.trace = LiveTrace(self.deltas, speed)
+        self.done = False
+
+        self.window = tk.Tk()
+        self.window.title(f"Live Search: {algorithm}")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.view = GridCanvas(grid, self.window, GUI_LAYERS)
+
+        controls = tk.Frame(self.window)
+        controls.pack(fill='x')
+        self.pause_button = tk.Button(controls, text="Pause", width=6, command=self.toggle_pause)
+        self.pause_button.pack(side='left')
+        tk.Button(controls, text="Step", command=self.step).pack(side='left')
+        tk.Label(controls, text="expansions/s (0: no limit)").pack(side='left')
+        self.speed = tk.Scale(controls, from_=0, to=10000, orient='horizontal', length=180, command=self.on_speed)
+        self.speed.set(speed)
+        self.speed.pack(side='left')
+        self.status = tk.Label(controls, text="")
+        self.status.pack(side='left')
+
+        options = dict(options or {}, trace=self.trace)
+        self.worker = threading.Thread(target=self.run_search, args=(algorithm, grid, start, goal_states, options),
+                                       daemon=True)
+        self.worker.start()
+        self.window.after(FRAME_MS, self.drain)
+
+    def run_search(self, algorithm, grid, start, goal_states, options):
+        try:
+            found, path, stats = solve(algorithm, grid, start, goal_states, options)
+            self.trace.finish(('done', found, path, stats))
+        except SearchCancelled:
+            pass
+        except Exception as error:
+            self.trace.finish(('error', f"{type(error).__name__}: {error}"))
+
+    # Apply every delta waiting in the queue and draw them as one frame
+    def drain(self):
+        if self.window is None:
+            return
+        while True:
+            try:
+                message = self.deltas.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'delta':
+                self.apply(message[1])
+            else:
+                self.finished(message)
+        self.view.render(force=True)
+        if not self.done:
+            self.status.config(text=f"{self.trace.expansions} expanded" +
+                               ("" if self.trace.running.is_set() else " (paused)"))
+            self.window.after(FRAME_MS, self.drain)
+
+    def apply(self, delta):
+        view, state = self.view, self.state
+        for cell, event in delta.items():
+            previous = state.get(cell)
+            if previous == event or previous == PATH:
+                continue
+            if previous is not None:
+                view.remove_from_layer(EVENT_NAMES[previous], [cell])
+            view.add_to_layer(EVENT_NAMES[event], [cell])
+            state[cell] = event
+
+    def finished(self, message):
+        self.done = True
+        if message[0] == 'error':
+            self.status.config(text=message[1])
+            return
+        _, found, path, stats = message
+        if found:
+            self.status.config(text=f"Path of {len(path) - 1} steps, {stats.expansions} expanded")
+        else:
+            self.status.config(text=f"No path, {stats.expansions} expanded")
+        self.pause_button.config(state='disabled')
+
+    def toggle_pause(self):
+        if self.trace.running.is_set():
+            self.trace.running.clear()
+            self.pause_button.config(text="Resume")
+        else:
+            self.trace.single_step = False
+            self.trace.running.set()
+            self.pause_button.config(text="Pause")
+
+    # Let the worker run one more expansion, then pause again
+    def step(self):
+        if self.done:
+            return
+        self.trace.single_step = True
+        self.trace.running.set()
+        self.pause_button.config(text="Resume")
+
+    def on_speed(self, value):
+        self.trace.speed = int(value)
+
+    def close(self):
+        self.trace.cancel()
+        self.window.destroy()
+        self.window = None
+
+    def run(self):
+        self.window.mainloop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a solver search a map live.")
+    parser.add_argument('map_file')
+    parser.add_argument('--algorithm', default='astar', choices=sorted(SOLVERS))
+    parser.add_argument('--depth-limit', type=int, default=None, help="depth limit for dls (default: rows*cols)")
+    parser.add_argument('--speed', type=int, default=50, help="expansions per second (0 for no limit)")
+    args = parser.parse_args(argv)
+
+    try:
+        grid, start, goal_states = load_map(args.map_file)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        sys.exit(1)
+    prepare_solver(args.algorithm)
+    LiveView(grid, start, goal_states, args.algorithm, {'depth_limit': args.depth_limit}, args.speed).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from collections import OrderedDict
+
+# LRU cache of data computed from a map, shared by the per-map caches of the solvers
+# (component indexes, distance fields, HPA* hierarchies). Entries are keyed by the map's
+# content hash, so any grid with the same obstacles and costs shares them. Subclasses give
+# build(grid, *args) to compute a missing entry, and key(grid, *args) when the entry also
+# depends on more than the map, e.g. a goal set.
+class MapCache:
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, grid, *args):
+        return grid.content_hash()
+
+    def build(self, grid, *args):
+        raise NotImplementedError
+
+    def get(self, grid, *args):
+        key = self.key(grid, *args)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        entry = self.build(grid, *args)
+        self.store(key, entry)
+        return entry
+
+    # Store an entry under key, evicting the least recently used one when full
+    def store(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,233 @@
+import sys
+import heapq
+import random
+import argparse
+from grid_map import GridMap, FREE, BLOCK
+from distance_field import compute_distance_field, UNREACHABLE
+
+# Seeded generator for large maps in the rectangle-block file format. Families:
+#   random      - random rectangles until a target share of the cells is blocked
+#   maze        - a perfect maze with one-cell corridors (random spanning tree)
+#   rooms       - a grid of rooms joined by doors, with a few extra doors making loops
+#   serpentine  - full-width walls with a gap at alternating ends, one long corridor
+# Maze, rooms and serpentine maps are always connected; --solvable makes the random family
+# pick its goals from the start's connected area as well.
+
+# Translates a 0/1 mask into grid cell characters
+MASK_TO_CELLS = bytes.maketrans(b'\x00\x01', bytes([FREE, BLOCK]))
+
+# Function to visit a cols x rows lattice in random depth-first order.
+# Returns the tree edges as ((x, y), (nx, ny)) pairs.
+def spanning_tree_edges(cols, rows, rng):
+    visited = bytearray(cols * rows)
+    visited[0] = 1
+    stack = [(0, 0)]
+    edges = []
+    while stack:
+        x, y = stack[-1]
+        options = [(nx, ny) for nx, ny in ((x, y - 1), (x - 1, y), (x, y + 1), (x + 1, y))
+                   if 0 <= nx < cols and 0 <= ny < rows and not visited[ny * cols + nx]]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny = rng.choice(options)
+        visited[ny * cols + nx] = 1
+        edges.append(((x, y), (nx, ny)))
+        stack.append((nx, ny))
+    return edges
+
+# Function to cover the mask with random rectangles until density of it is blocked.
+# Returns the rectangles as (x, y, w, h).
+def random_rectangles(mask, num_rows, num_cols, rng, density, max_block):
+    target = int(density * num_rows * num_cols)
+    blocked = 0
+    blocks = []
+    while blocked < target:
+        w = rng.randint(1, min(max_block, num_cols))
+        h = rng.randint(1, min(max_block, num_rows))
+        x = rng.randrange(num_cols - w + 1)
+        y = rng.randrange(num_rows - h + 1)
+        blocks.append((x, y, w, h))
+        run = b'\x01' * w
+        for row in range(y, y + h):
+            start = row * num_cols + x
+            blocked += mask.count(0, start, start + w)
+            mask[start:start + w] = run
+    return blocks
+
+# Function to carve a maze: lattice cells sit on even coordinates, walls in between
+def carve_maze(mask, num_rows, num_cols, rng):
+    mask[:] = b'\x01' * len(mask)
+    cols, rows = (num_cols + 1) // 2, (num_rows + 1) // 2
+    for y in range(rows):
+        for x in range(cols):
+            mask[2 * y * num_cols + 2 * x] = 0
+    for (x, y), (nx, ny) in spanning_tree_edges(cols, rows, rng):
+        mask[(y + ny) * num_cols + x + nx] = 0
+
+# Function to draw rooms of room_size cells separated by one-cell walls, with a door for
+# every spanning tree edge between rooms plus extra doors with probability loop_chance
+def draw_rooms(mask, num_rows, num_cols, rng, room_size, loop_chance):
+    pitch = room_size + 1
+    for y in range(room_size, num_rows, pitch):
+        mask[y * num_cols:(y + 1) * num_cols] = b'\x01' * num_cols
+    for x in range(room_size, num_cols, pitch):
+        mask[x::num_cols] = b'\x01' * len(range(x, len(mask), num_cols))
+
+    cols, rows = (num_cols + room_size) // pitch, (num_rows + room_size) // pitch
+    doors = {tuple(sorted(edge)) for edge in spanning_tree_edges(cols, rows, rng)}
+    for y in range(rows):
+        for x in range(cols):
+            for neighbor in ((x + 1, y), (x, y + 1)):
+                if neighbor[0] < cols and neighbor[1] < rows and rng.random() < loop_chance:
+                    doors.add(((x, y), neighbor))
+    for (x, y), (nx, ny) in doors:
+        if nx > x:  # door in the wall column to the right of room (x, y)
+            door_y = y * pitch + rng.randrange(min(room_size, num_rows - y * pitch))
+            mask[door_y * num_cols + x * pitch + room_size] = 0
+        else:  # door in the wall row below room (x, y)
+            door_x = x * pitch + rng.randrange(min(room_size, num_cols - x * pitch))
+            mask[(y * pitch + room_size) * num_cols + door_x] = 0
+
+# Function to draw full-width walls every corridor + 1 rows, open at alternating ends
+def draw_serpentine(mask, num_rows, num_cols, corridor):
+    for count, y in enumerate(range(corridor, num_rows, corridor + 1)):
+        mask[y * num_cols:(y + 1) * num_cols] = b'\x01' * num_cols
+        gap = num_cols - 1 if count % 2 == 0 else 0
+        mask[y * num_cols + gap] = 0
+
+# Function to cover the blocked cells of a mask with rectangles: horizontal runs per row,
+# merged downwards while the next row has a run with the same columns
+def mask_to_blocks(mask, num_rows, num_cols):
+    blocks = []
+    open_runs = {}  # (x, w) -> [x, y, w, h] still growing downwards
+    for y in range(num_rows):
+        row_start = y * num_cols
+        row_end = row_start + num_cols
+        runs = {}
+        position = mask.find(1, row_start, row_end)
+        while position != -1:
+            end = mask.find(0, position, row_end)
+            if end == -1:
+                end = row_end
+            key = (position - row_start, end - position)
+            block = open_runs.pop(key, None)
+            if block is None:
+                block = [key[0], y, key[1], 0]
+            block[3] += 1
+            runs[key] = block
+            position = mask.find(1, end, row_end)
+        blocks.extend(open_runs.values())
+        open_runs = runs
+    blocks.extend(open_runs.values())
+    blocks.sort(key=lambda block: (block[1], block[0]))
+    return [tuple(block) for block in blocks]
+
+# Function to pick a free cell at random, optionally only among reachable ones
+def random_free_cell(mask, num_cols, rng, reachable=None, attempts=100000):
+    for _ in range(attempts):
+        i = rng.randrange(len(mask))
+        if not mask[i] and (reachable is None or reachable[i] != UNREACHABLE):
+            return (i % num_cols, i // num_cols)
+    raise ValueError("could not find a free cell; try a lower density")
+
+# Function to choose the start and goals.
+# 'random' draws them uniformly from the free cells; 'far' starts at the first free cell in
+# reading order and takes the goals farthest from it, which makes the longest searches.
+def place_start_and_goals(mask, num_rows, num_cols, rng, num_goals, placement, solvable):
+    grid = GridMap(num_rows, num_cols)
+    grid.cells[:] = bytes(mask).translate(MASK_TO_CELLS)
+    if placement == 'far':
+        first = mask.find(0)
+        if first == -1:
+            raise ValueError("the map has no free cells")
+        start = (first % num_cols, first // num_cols)
+        distances = compute_distance_field(grid, [start])
+        farthest = [i for i in heapq.nlargest(num_goals, range(len(distances)), key=distances.__getitem__)
+                    if distances[i] > 0]
+        if not farthest:
+            raise ValueError("the start cell has no reachable neighbors")
+        return start, [(i % num_cols, i // num_cols) for i in farthest]
+
+    for _ in range(100):
+        start = random_free_cell(mask, num_cols, rng)
+        reachable = compute_distance_field(grid, [start]) if solvable else None
+        if reachable is not None and sum(1 for d in reachable if d > 0) < num_goals:
+            continue  # start sits in a pocket too small for the goals, try another one
+        goals = []
+        while len(goals) < num_goals:
+            goal = random_free_cell(mask, num_cols, rng, reachable)
+            if goal != start and goal not in goals:
+                goals.append(goal)
+        return start, goals
+    raise ValueError("could not place a solvable start and goals; try a lower density")
+
+# Function to generate a map. Returns (num_rows, num_cols, start, goals, blocks).
+def generate_map(family, num_rows, num_cols, seed=None, density=0.3, max_block=8, room_size=8,
+                 loop_chance=0.1, corridor=1, num_goals=1, placement='random', solvable=False):
+    if num_rows < 1 or num_cols < 1 or num_rows * num_cols < 2:
+        raise ValueError("the map needs at least two cells")
+    if not 0 <= density < 1:
+        raise ValueError(f"the density must be at least 0 and below 1, got {density}")
+    rng = random.Random(seed)
+    mask = bytearray(num_rows * num_cols)
+    if family == 'random':
+        blocks = random_rectangles(mask, num_rows, num_cols, rng, density, max_block)
+    elif family == 'maze':
+        carve_maze(mask, num_rows, num_cols, rng)
+        blocks = mask_to_blocks(mask, num_rows, num_cols)
+    elif family == 'rooms':
+        draw_rooms(mask, num_rows, num_cols, rng, room_size, loop_chance)
+        blocks = mask_to_blocks(mask, num_rows, num_cols)
+    elif family == 'serpentine':
+        draw_serpentine(mask, num_rows, num_cols, corridor)
+        blocks = mask_to_blocks(mask, num_rows, num_cols)
+    else:
+        raise ValueError(f"Unknown map family '{family}'")
+    if mask.count(0) <= num_goals:
+        raise ValueError("too few free cells for the start and goals")
+    start, goals = place_start_and_goals(mask, num_rows, num_cols, rng, num_goals, placement, solvable)
+    return num_rows, num_cols, start, goals, blocks
+
+# Function to write a map in the text format read by the solvers
+def write_map(file, num_rows, num_cols, start, goals, blocks, comment=None):
+    file.write(f"[{num_rows},{num_cols}]" + (f" // {comment}" if comment else "") + "\n")
+    file.write(f"({start[0]},{start[1]})\n")
+    file.write(" | ".join(f"({x},{y})" for x, y in goals) + "\n")
+    file.writelines(f"({x},{y},{w},{h})\n" for x, y, w, h in blocks)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a seeded map in the rectangle-block format.")
+    parser.add_argument('family', choices=['random', 'maze', 'rooms', 'serpentine'])
+    parser.add_argument('rows', type=int)
+    parser.add_argument('cols', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--density', type=float, default=0.3, help="random: share of blocked cells")
+    parser.add_argument('--max-block', type=int, default=8, help="random: largest rectangle side")
+    parser.add_argument('--room-size', type=int, default=8, help="rooms: room side length")
+    parser.add_argument('--loops', type=float, default=0.1, help="rooms: chance of an extra door")
+    parser.add_argument('--corridor', type=int, default=1, help="serpentine: corridor width")
+    parser.add_argument('--goals', type=int, default=1, help="number of goal cells")
+    parser.add_argument('--placement', choices=['random', 'far'], default='random',
+                        help="random cells, or start top-left with the farthest reachable goals")
+    parser.add_argument('--solvable', action='store_true', help="only place goals reachable from the start")
+    parser.add_argument('-o', '--output', default='-', help="output file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        num_rows, num_cols, start, goals, blocks = generate_map(
+            args.family, args.rows, args.cols, args.seed, args.density, args.max_block, args.room_size,
+            args.loops, args.corridor, args.goals, args.placement, args.solvable)
+    except ValueError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        sys.exit(1)
+
+    comment = f"{args.family} map, seed {args.seed}"
+    if args.output == '-':
+        write_map(sys.stdout, num_rows, num_cols, start, goals, blocks, comment)
+    else:
+        with open(args.output, 'w') as file:
+            write_map(file, num_rows, num_cols, start, goals, blocks, comment)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import itertools
+
+# Open list for best-first searches: a binary heap on a plain list plus a position index,
+# giving O(1) membership tests and O(log n) push, pop and decrease-key.
+# Entries are [priority, tie, order, item]; ties on priority are broken by the optional
+# per-push tie value, then by insertion order ('fifo') or reverse insertion order ('lifo').
+class OpenList:
+    def __init__(self, tie_break='fifo'):
+        if tie_break not in ('fifo', 'lifo'):
+            raise ValueError(f"Unknown tie-break rule: {tie_break}")
+        self.heap = []
+        self.position = {}  # item -> index of its entry in heap
+        self.counter = itertools.count()
+        self.order_sign = 1 if tie_break == 'fifo' else -1
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __bool__(self):
+        return bool(self.heap)
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def __iter__(self):
+        return iter(self.position)
+
+    def empty(self):
+        return not self.heap
+
+    # Priority currently stored for item (KeyError if it is not in the open list)
+    def priority(self, item):
+        return self.heap[self.position[item]][0]
+
+    # Insert item, or move it to its new priority if it is already queued
+    def push(self, item, priority, tie=0):
+        entry = [priority, tie, self.order_sign * next(self.counter), item]
+        index = self.position.get(item)
+        if index is None:
+            self.heap.append(entry)
+            index = len(self.heap) - 1
+            self.position[item] = index
+            self._sift_up(index)
+        else:
+            old = self.heap[index]
+            self.heap[index] = entry
+            if entry < old:
+                self._sift_up(index)
+            else:
+                self._sift_down(index)
+
+    # Remove and return the item with the lowest priority
+    def pop(self):
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        del self.position[top[3]]
+        if heap:
+            heap[0] = last
+            self.position[last[3]] = 0
+            self._sift_down(0)
+        return top[3]
+
+    # Remove and return (item, priority) for the lowest priority entry
+    def pop_with_priority(self):
+        priority = self.heap[0][0]
+        return self.pop(), priority
+
+    def peek_priority(self):
+        return self.heap[0][0]
+
+    def remove(self, item):
+        index = self.position.pop(item)
+        heap = self.heap
+        last = heap.pop()
+        if index < len(heap):
+            old = heap[index]
+            heap[index] = last
+            self.position[last[3]] = index
+            if last < old:
+                self._sift_up(index)
+            else:
+                self._sift_down(index)
+
+    def _sift_up(self, index):
+        heap, position = self.heap, self.position
+        entry = heap[index]
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent = heap[parent_index]
+            if entry < parent:
+                heap[index] = parent
+                position[parent[3]] = index
+                index = parent_index
+            else:
+                break
+        heap[index] = entry
+        position[entry[3]] = index
+
+    def _sift_down(self, index):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[index]
+        child_index = 2 * index + 1
+        while child_index < size:
+            right_index = child_index + 1
+            if right_index < size and heap[right_index] < heap[child_index]:
+                child_index = right_index
+            child = heap[child_index]
+            if child < entry:
+                heap[index] = child
+                position[child[3]] = index
+                index = child_index
+                child_index = 2 * index + 1
+            else:
+                break
+        heap[index] = entry
+        position[entry[3]] = index
@@ -0,0 +1,84 @@
+from collections import OrderedDict
+from solvers import solve
+from search_stats import SearchStats
+
+# Solvers whose paths are always shortest. Every suffix of a shortest path to the nearest goal
+# is itself a shortest path from its first cell, so a query starting anywhere on such a path
+# can be answered from it.
+OPTIMAL_SOLVERS = {'bfs', 'astar', 'astar-field', 'jps'}
+
+# Result cache in front of solvers.solve, keyed by the map's content hash, the algorithm, the
+# start and the goal set, with LRU eviction. Results of the optimal solvers are also indexed
+# cell by cell so later queries starting on a cached path skip the search.
+class PathCache:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (map hash, algorithm, start, goals, depth limit) -> (found, path, stats)
+        self.suffixes = {}  # (map hash, goals) -> {cell: (path, position of cell on path)}
+        self.hits = 0
+        self.subpath_hits = 0
+        self.misses = 0
+        self.last_hit = None  # 'exact', 'subpath' or None for the last solve() call
+
+    # Function to answer a query like solvers.solve, from the cache when possible.
+    # Traced queries always search, since the trace has to record the search.
+    def solve(self, algorithm, grid, start, goal_states, options=None):
+        options = options or {}
+        self.last_hit = None
+        if options.get('trace'):
+            return solve(algorithm, grid, start, goal_states, options)
+
+        start = tuple(start)
+        map_hash = grid.content_hash()
+        goals = frozenset(tuple(goal) for goal in goal_states)
+        key = (map_hash, algorithm, start, goals, options.get('depth_limit'))
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.last_hit = 'exact'
+            found, path, stats = result
+            return found, list(path), stats
+        if algorithm in OPTIMAL_SOLVERS:
+            suffix = self.suffixes.get((map_hash, goals), {}).get(start)
+            if suffix is not None:
+                path, position = suffix
+                self.subpath_hits += 1
+                self.last_hit = 'subpath'
+                return True, list(path[position:]), SearchStats(algorithm)
+
+        self.misses += 1
+        found, path, stats = solve(algorithm, grid, start, goal_states, options)
+        self.store(key, algorithm, (found, tuple(path), stats))
+        return found, path, stats
+
+    def store(self, key, algorithm, result):
+        self.entries[key] = result
+        found, path, _ = result
+        if found and algorithm in OPTIMAL_SOLVERS:
+            cells = self.suffixes.setdefault((key[0], key[3]), {})
+            for position, cell in enumerate(path):
+                cells.setdefault(cell, (path, position))
+        while len(self.entries) > self.max_entries:
+            self.evict()
+
+    # Drop the least recently used entry and any suffix links into its path
+    def evict(self):
+        key, (found, path, _) = self.entries.popitem(last=False)
+        cells = self.suffixes.get((key[0], key[3]))
+        if not found or cells is None:
+            return
+        for cell in path:
+            suffix = cells.get(cell)
+            if suffix is not None and suffix[0] is path:
+                del cells[cell]
+        if not cells:
+            del self.suffixes[(key[0], key[3])]
+
+    def stats(self):
+        return {'entries': len(self.entries), 'hits': self.hits, 'subpath_hits': self.subpath_hits,
+                'misses': self.misses}
+
+    def clear(self):
+        self.entries.clear()
+        self.suffixes.clear()
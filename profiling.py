@@ -0,0 +1,244 @@
+import os
+import sys
+import time
+import argparse
+import cProfile
+import pstats
+import threading
+from collections import Counter
+from grid_map import load_map
+from solvers import SOLVERS, solve, prepare_solver
+
+# Instrumentation for the solvers. It plugs into the event interface the search loops already
+# call for search traces (expand, push, pop, expand_backward, push_backward, path_found), so
+# it is passed wherever a TraceWriter is, e.g. as options['trace'] to solvers.solve. The loops
+# only test `if trace:` per event, so a search run without hooks does no extra work per node.
+
+# Event sink calling user hooks; on_expand and on_push get the cell, on_goal the final path.
+# Every event is also passed on to trace when one is given, so hooks can run alongside a recording.
+class SearchHooks:
+    def __init__(self, on_expand=None, on_push=None, on_pop=None, on_goal=None, trace=None):
+        self.on_expand = on_expand
+        self.on_push = on_push
+        self.on_pop = on_pop
+        self.on_goal = on_goal
+        self.trace = trace
+
+    def expand(self, cell):
+        if self.on_expand:
+            self.on_expand(cell)
+        if self.trace:
+            self.trace.expand(cell)
+
+    def push(self, cell):
+        if self.on_push:
+            self.on_push(cell)
+        if self.trace:
+            self.trace.push(cell)
+
+    def pop(self, cell):
+        if self.on_pop:
+            self.on_pop(cell)
+        if self.trace:
+            self.trace.pop(cell)
+
+    def expand_backward(self, cell):
+        if self.on_expand:
+            self.on_expand(cell)
+        if self.trace:
+            self.trace.expand_backward(cell)
+
+    def push_backward(self, cell):
+        if self.on_push:
+            self.on_push(cell)
+        if self.trace:
+            self.trace.push_backward(cell)
+
+    def path_found(self, path):
+        if self.on_goal:
+            self.on_goal(path)
+        if self.trace:
+            self.trace.path_found(path)
+
+    def close(self):
+        if self.trace:
+            self.trace.close()
+
+# Sampled timing of the parts of a search loop. Every `every`-th expansion is timed from its
+# expand event to the next one, and each interval between two events is charged to the event
+# that ends it:
+#   generate     ends at a push: neighbor generation, the heuristic and the open-list push
+#   select       ends at an expand: the rest of the neighbor loop and the open-list pop
+#   backtrack    ends at a pop: leaving a dead end in the depth-first solvers
+#   reconstruct  ends at path_found: the goal test and path reconstruction, timed from the
+#                last expansion whether or not it was sampled
+# Unsampled events cost a counter decrement, plus one clock read per expansion.
+class PhaseSampler(SearchHooks):
+    def __init__(self, every=64, trace=None):
+        super().__init__(trace=trace)
+        self.every = every
+        self.countdown = 1  # the first expansion is always sampled
+        self.last = None  # time of the previous event while sampling, else None
+        self.expanded_at = None  # time of the latest expansion
+        self.totals = Counter()  # phase -> sampled seconds
+        self.samples = 0
+        self.expansions = 0
+
+    def charge(self, phase):
+        now = time.perf_counter()
+        self.totals[phase] += now - self.last
+        self.last = now
+
+    def expand(self, cell):
+        if self.last is not None:
+            self.charge('select')
+        self.expanded_at = time.perf_counter()
+        self.expansions += 1
+        self.countdown -= 1
+        if self.countdown == 0:
+            self.countdown = self.every
+            self.samples += 1
+            self.last = self.expanded_at
+        else:
+            self.last = None
+        super().expand(cell)
+
+    def expand_backward(self, cell):
+        self.expand(cell)
+
+    def push(self, cell):
+        if self.last is not None:
+            self.charge('generate')
+        super().push(cell)
+
+    def push_backward(self, cell):
+        self.push(cell)
+
+    def pop(self, cell):
+        if self.last is not None:
+            self.charge('backtrack')
+        super().pop(cell)
+
+    def path_found(self, path):
+        if self.expanded_at is not None:
+            self.last = self.expanded_at
+            self.charge('reconstruct')
+        self.last = None
+        super().path_found(path)
+
+    # Sampled time per phase scaled up to the whole search, in milliseconds
+    def estimate_ms(self):
+        scale = self.expansions / self.samples if self.samples else 0
+        estimate = {phase: round(seconds * scale * 1000, 3) for phase, seconds in self.totals.items()}
+        if 'reconstruct' in self.totals:
+            estimate['reconstruct'] = round(self.totals['reconstruct'] * 1000, 3)  # happens once, not per expansion
+        return estimate
+
+    def as_dict(self):
+        return {'expansions': self.expansions, 'samples': self.samples,
+                'sampled_ms': {phase: round(seconds * 1000, 3) for phase, seconds in self.totals.items()},
+                'estimated_ms': self.estimate_ms()}
+
+# Function to run one query under cProfile, returning ((found, path, stats), pstats.Stats).
+# With output the raw profile is also written there for pstats, snakeviz and similar tools.
+def profile_solve(algorithm, grid, start, goal_states, options=None, output=None):
+    profiler = cProfile.Profile()
+    result = profiler.runcall(solve, algorithm, grid, start, goal_states, options)
+    if output:
+        profiler.dump_stats(output)
+    return result, pstats.Stats(profiler)
+
+# Statistical profiler producing collapsed stacks ("outer;inner;leaf count" lines) as read by
+# flamegraph.pl and speedscope. A daemon thread samples the stack of the thread that started
+# it; samples are only taken when the interpreter switches threads, so intervals shorter than
+# sys.getswitchinterval() are not honored.
+class StackSampler:
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.stacks = Counter()
+        self.thread_id = None
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        self.thread_id = threading.get_ident()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+    def write(self, file):
+        for stack, count in sorted(self.stacks.items()):
+            file.write(f"{stack} {count}\n")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+# Function to turn a frame and its callers into one collapsed stack, outermost call first
+def collapse_stack(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile one solver query on a map.")
+    parser.add_argument('map_file')
+    parser.add_argument('--algorithm', default='astar', choices=sorted(SOLVERS))
+    parser.add_argument('--depth-limit', type=int, default=None, help="depth limit for dls (default: rows*cols)")
+    parser.add_argument('--repeat', type=int, default=1, help="times to run the query in each profile")
+    parser.add_argument('--sample-every', type=int, default=64, help="expansions between timed samples")
+    parser.add_argument('--pstats', help="write the cProfile data to this file")
+    parser.add_argument('--collapsed', help="write sampled collapsed stacks to this file")
+    parser.add_argument('--sort', default='cumulative', help="pstats sort key for the printed table")
+    parser.add_argument('--limit', type=int, default=20, help="functions shown in the printed table")
+    args = parser.parse_args(argv)
+
+    try:
+        grid, start, goal_states = load_map(args.map_file)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        sys.exit(1)
+    prepare_solver(args.algorithm)
+    options = {'depth_limit': args.depth_limit}
+
+    sampler = PhaseSampler(args.sample_every)
+    for _ in range(args.repeat):
+        found, path, stats = solve(args.algorithm, grid, start, goal_states, dict(options, trace=sampler))
+    print(f"{args.algorithm}: found={found} length={len(path) - 1 if found else None} expansions={stats.expansions}")
+    print("Sampled phases:", sampler.as_dict())
+
+    def run_all():
+        for _ in range(args.repeat):
+            solve(args.algorithm, grid, start, goal_states, options)
+
+    if args.collapsed:
+        with StackSampler() as stack_sampler:
+            run_all()
+        with open(args.collapsed, 'w') as file:
+            stack_sampler.write(file)
+        print(f"Wrote {sum(stack_sampler.stacks.values())} stack samples to {args.collapsed}")
+
+    profiler = cProfile.Profile()
+    profiler.runcall(run_all)
+    if args.pstats:
+        profiler.dump_stats(args.pstats)
+    pstats.Stats(profiler).sort_stats(args.sort).print_stats(args.limit)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import sys
+import tkinter as tk
+from collections import Counter
+from grid_map import BLOCK, ROBOT, GOAL, load_map
+from search_trace import (EXPAND, PUSH, POP, PATH, EXPAND_BACKWARD, PUSH_BACKWARD,
+                          EVENT_NAMES, EVENT_SHIFT, INDEX_MASK, read_trace, decode_event)
+
+# Colors for the last event seen on each cell
+STATE_COLORS = {0: 'white', EXPAND: 'light grey', PUSH: 'orange', POP: '#f5f5dc',
+                PATH: 'yellow', EXPAND_BACKWARD: 'pink', PUSH_BACKWARD: 'light blue'}
+
+KEYFRAME_INTERVAL = 1 << 14  # events between stored snapshots used for seeking
+FRAME_MS = 30
+
+# Replays a recorded trace on a canvas, independent of the solver that produced it
+class ReplayViewer:
+    def __init__(self, num_rows, num_cols, events, grid=None, speed=20):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.events = events
+        self.base = grid.cells if grid is not None else None
+        self.state = bytearray(num_rows * num_cols)  # last event code per cell
+        self.position = 0
+        self.keyframes = {0: bytes(self.state)}
+        self.dirty = set()
+        self.playing = False
+        self.carry = 0.0
+
+        self.window = tk.Tk()
+        self.window.title("Search Trace Replay")
+        self.cell_size = max(1, 500 // max(num_rows, num_cols))
+        self.canvas = tk.Canvas(self.window, width=num_cols * self.cell_size, height=num_rows * self.cell_size)
+        self.canvas.pack()
+        self.rectangles = []
+        outline = 'gray' if self.cell_size > 3 else ''
+        for i in range(num_rows * num_cols):
+            y, x = divmod(i, num_cols)
+            self.rectangles.append(self.canvas.create_rectangle(
+                x * self.cell_size, y * self.cell_size, (x + 1) * self.cell_size, (y + 1) * self.cell_size,
+                fill=self.cell_color(i), outline=outline))
+
+        controls = tk.Frame(self.window)
+        controls.pack(fill='x')
+        self.play_button = tk.Button(controls, text="Play", width=6, command=self.toggle_play)
+        self.play_button.pack(side='left')
+        tk.Button(controls, text="Step", command=lambda: self.seek(self.position + 1)).pack(side='left')
+        tk.Label(controls, text="events/s").pack(side='left')
+        self.speed = tk.Scale(controls, from_=1, to=100000, orient='horizontal', length=180)
+        self.speed.set(speed)
+        self.speed.pack(side='left')
+        self.status = tk.Label(controls, text="")
+        self.status.pack(side='left')
+        self.seek_bar = tk.Scale(self.window, from_=0, to=len(events), orient='horizontal',
+                                 showvalue=False, command=self.on_seek_bar)
+        self.seek_bar.pack(fill='x')
+        self.shown_position = 0
+        self.update_status()
+
+    def cell_color(self, i):
+        state = self.state[i]
+        if state == PATH:
+            return STATE_COLORS[PATH]
+        if self.base is not None:
+            cell = self.base[i]
+            if cell == BLOCK:
+                return 'black'
+            if cell == ROBOT:
+                return 'blue'
+            if cell == GOAL:
+                return 'green'
+        return STATE_COLORS.get(state, 'white')
+
+    # Apply events up to target, storing a snapshot at every keyframe boundary on the way
+    def advance(self, target):
+        events, state, dirty = self.events, self.state, self.dirty
+        while self.position < target:
+            boundary = (self.position // KEYFRAME_INTERVAL + 1) * KEYFRAME_INTERVAL
+            stop = min(target, boundary)
+            for value in events[self.position:stop]:
+                index = value & INDEX_MASK
+                state[index] = value >> EVENT_SHIFT
+                dirty.add(index)
+            self.position = stop
+            if stop == boundary and stop not in self.keyframes:
+                self.keyframes[stop] = bytes(state)
+
+    # Jump to any event position, restarting from the nearest snapshot when going back
+    def seek(self, target):
+        target = max(0, min(target, len(self.events)))
+        keyframe = (target // KEYFRAME_INTERVAL) * KEYFRAME_INTERVAL
+        while keyframe not in self.keyframes:
+            keyframe -= KEYFRAME_INTERVAL
+        if target < self.position or keyframe > self.position:
+            self.state[:] = self.keyframes[keyframe]
+            self.position = keyframe
+            self.dirty = set(range(len(self.state)))
+        self.advance(target)
+        self.redraw()
+
+    def redraw(self):
+        for i in self.dirty:
+            self.canvas.itemconfig(self.rectangles[i], fill=self.cell_color(i))
+        self.dirty = set()
+        self.shown_position = self.position
+        self.seek_bar.set(self.position)
+        self.update_status()
+
+    # The scale also reports the positions set by redraw, so only react to real drags
+    def on_seek_bar(self, value):
+        if int(value) != self.shown_position:
+            self.seek(int(value))
+
+    def update_status(self):
+        self.status.config(text=f"{self.position}/{len(self.events)}")
+
+    def toggle_play(self):
+        self.playing = not self.playing
+        self.play_button.config(text="Pause" if self.playing else "Play")
+        if self.playing:
+            if self.position >= len(self.events):
+                self.seek(0)
+            self.tick()
+
+    def tick(self):
+        if not self.playing:
+            return
+        self.carry += self.speed.get() * FRAME_MS / 1000
+        steps = int(self.carry)
+        self.carry -= steps
+        if steps:
+            self.advance(min(self.position + steps, len(self.events)))
+            self.redraw()
+        if self.position >= len(self.events):
+            self.toggle_play()
+            return
+        self.window.after(FRAME_MS, self.tick)
+
+    def run(self):
+        self.window.mainloop()
+
+# Print how many events of each kind a trace holds
+def print_summary(num_rows, num_cols, events):
+    counts = Counter(decode_event(value)[0] for value in events)
+    print(f"Grid: {num_rows}x{num_cols}, events: {len(events)}")
+    for event, name in EVENT_NAMES.items():
+        if counts[event]:
+            print(f"  {name}: {counts[event]}")
+
+def main(trace_path, map_path=None, speed=20, summary=False):
+    try:
+        num_rows, num_cols, events = read_trace(trace_path)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+    if summary:
+        print_summary(num_rows, num_cols, events)
+        return
+    grid = None
+    if map_path:
+        grid, _, _ = load_map(map_path)
+        if (grid.num_rows, grid.num_cols) != (num_rows, num_cols):
+            print("Error: The map size does not match the trace.")
+            sys.exit(1)
+    ReplayViewer(num_rows, num_cols, events, grid, speed).run()
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    summary = '--summary' in args
+    args = [arg for arg in args if arg != '--summary']
+    speed = 20
+    if '--speed' in args:
+        position = args.index('--speed')
+        speed = int(args[position + 1])
+        del args[position:position + 2]
+    if len(args) not in [1, 2]:
+        print("Usage: python replay.py <trace_file> [map_file] [--speed <events per second>] [--summary]")
+        sys.exit(1)
+    main(args[0], args[1] if len(args) == 2 else None, speed, summary)
@@ -0,0 +1,70 @@
+import json
+import time
+from contextlib import contextmanager
+
+# Phases timed by the scripts; search includes reconstruct, build (per-map data such as a
+# distance field or HPA* cluster graphs made for the query), and render while a GUI animates it
+PHASES = ('parse', 'rasterize', 'search', 'build', 'reconstruct', 'render')
+
+# Counters and phase timings of one search, filled in by every solver. The counters are plain
+# integers updated as the search runs, so collecting them costs no memory.
+#   expansions    cells whose neighbors were generated
+#   generations   free neighbors generated
+#   pushes        cells put on the open list (a priority change counts again) or on the
+#                 path stack of the depth-first solvers
+#   pops          cells taken off the open list, or backtracked off the path stack
+#   reexpansions  cells expanded again (or reopened for it) after an earlier expansion
+#   peak_open     largest open list, frontier or path stack
+#   peak_closed   largest closed set, parent map or transposition table
+#   iterations    passes of IDA* and iterative deepening (0 for single-pass searches)
+class SearchStats:
+    def __init__(self, algorithm=None):
+        self.algorithm = algorithm
+        self.expansions = 0
+        self.generations = 0
+        self.pushes = 0
+        self.pops = 0
+        self.reexpansions = 0
+        self.peak_open = 0
+        self.peak_closed = 0
+        self.iterations = 0
+        self.timings = {}  # phase -> seconds
+
+    def open_size(self, size):
+        if size > self.peak_open:
+            self.peak_open = size
+
+    def closed_size(self, size):
+        if size > self.peak_closed:
+            self.peak_closed = size
+
+    # Context manager adding the time spent inside it to a phase
+    @contextmanager
+    def phase(self, name):
+        began = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - began
+
+    def as_dict(self):
+        return {
+            'algorithm': self.algorithm,
+            'expansions': self.expansions,
+            'generations': self.generations,
+            'pushes': self.pushes,
+            'pops': self.pops,
+            'reexpansions': self.reexpansions,
+            'peak_open': self.peak_open,
+            'peak_closed': self.peak_closed,
+            'iterations': self.iterations,
+            'timings_ms': {name: round(seconds * 1000, 3) for name, seconds in self.timings.items()},
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_dict())
+
+# Remove a '--stats' flag from an argument list, returning (flag given, remaining args)
+def split_stats_option(argv):
+    return '--stats' in argv, [arg for arg in argv if arg != '--stats']
+
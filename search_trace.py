@@ -0,0 +1,108 @@
+import sys
+import struct
+from array import array
+
+# Binary search trace: a fixed header followed by one little-endian uint32 per event.
+# Each event packs the event code into the top 3 bits and the flat cell index
+# (y * num_cols + x) into the low 29 bits, so grids of up to 2**29 cells are supported.
+MAGIC = b'PFTR'
+VERSION = 1
+HEADER = struct.Struct('<4sHII')  # magic, version, num_rows, num_cols
+
+EXPAND = 1            # cell taken off the frontier and its neighbors generated
+PUSH = 2              # cell added to the frontier (or to the current path for depth-first solvers)
+POP = 3               # cell dropped from the frontier or current path without a solution (backtrack)
+PATH = 4              # cell of the final path, emitted from start to goal
+EXPAND_BACKWARD = 5   # EXPAND on the goal side of a bidirectional search
+PUSH_BACKWARD = 6     # PUSH on the goal side of a bidirectional search
+
+EVENT_NAMES = {EXPAND: 'expand', PUSH: 'push', POP: 'pop', PATH: 'path',
+               EXPAND_BACKWARD: 'expand-backward', PUSH_BACKWARD: 'push-backward'}
+
+EVENT_SHIFT = 29
+INDEX_MASK = (1 << EVENT_SHIFT) - 1
+
+# Event sink handed to the solvers; records are buffered in an array and written in chunks
+class TraceWriter:
+    def __init__(self, file_path, grid, flush_events=1 << 16):
+        if grid.num_rows * grid.num_cols > INDEX_MASK + 1:
+            raise ValueError("Grid is too large for the trace format")
+        self.num_cols = grid.num_cols
+        self.flush_events = flush_events
+        self.events = array('I')
+        self.file = open(file_path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, grid.num_rows, grid.num_cols))
+
+    def record(self, event, cell):
+        self.events.append((event << EVENT_SHIFT) | (cell[1] * self.num_cols + cell[0]))
+        if len(self.events) >= self.flush_events:
+            self.flush()
+
+    def expand(self, cell):
+        self.record(EXPAND, cell)
+
+    def push(self, cell):
+        self.record(PUSH, cell)
+
+    def pop(self, cell):
+        self.record(POP, cell)
+
+    def expand_backward(self, cell):
+        self.record(EXPAND_BACKWARD, cell)
+
+    def push_backward(self, cell):
+        self.record(PUSH_BACKWARD, cell)
+
+    def path_found(self, path):
+        for cell in path:
+            self.record(PATH, cell)
+
+    def flush(self):
+        if sys.byteorder == 'big':
+            self.events.byteswap()
+        self.events.tofile(self.file)
+        self.events = array('I')
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# Load a trace file and return (num_rows, num_cols, events) with the raw packed events
+def read_trace(file_path):
+    with open(file_path, 'rb') as file:
+        header = file.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"'{file_path}' is not a search trace")
+        magic, version, num_rows, num_cols = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"'{file_path}' is not a search trace")
+        if version != VERSION:
+            raise ValueError(f"Unsupported trace version {version}")
+        data = file.read()
+    events = array('I')
+    events.frombytes(data[:len(data) - len(data) % events.itemsize])
+    if sys.byteorder == 'big':
+        events.byteswap()
+    return num_rows, num_cols, events
+
+# Split a packed event into (event code, flat cell index)
+def decode_event(value):
+    return value >> EVENT_SHIFT, value & INDEX_MASK
+
+# Remove a '--trace <file>' option from an argument list, returning (trace_path, remaining args)
+def split_trace_option(argv):
+    if '--trace' not in argv:
+        return None, list(argv)
+    position = argv.index('--trace')
+    if position + 1 >= len(argv):
+        print("Error: --trace needs an output file.")
+        sys.exit(1)
+    return argv[position + 1], list(argv[:position]) + list(argv[position + 2:])
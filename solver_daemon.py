@@ -0,0 +1,193 @@
+import io
+import os
+import sys
+import json
+import signal
+import time
+import socket
+import argparse
+import threading
+import socketserver
+from grid_map import load_map
+from solvers import SOLVERS, prepare_solver
+from batch import answer_query, check_options
+from distance_field import distance_field_cache
+from components import component_cache
+from path_cache import PathCache
+
+# Long-running solver service. Maps stay parsed in memory and the solver modules stay
+# imported, so a query costs only the search. Requests are JSON lines, answered in order:
+#   {"id": 1, "map": "input.txt", "start": [0, 1], "goals": [[7, 0]], "algorithm": "bfs"}
+#   {"command": "load", "map": "big", "path": "maps/big.txt"}
+#   {"command": "unload", "map": "big"}
+#   {"command": "maps"} / {"command": "stats"}
+# A solve request may leave out start, goals or algorithm to use the map's own start and
+# goals and the service default; "include_path": false leaves out the path and directions and
+# "include_stats": true adds the search statistics.
+# Maps are only opened by a load command or at startup, from files inside the map root, and at
+# most max_maps are held at once. Results go through a PathCache, so repeated queries and
+# queries starting on a cached shortest path are answered without searching.
+
+class SolverService:
+    def __init__(self, algorithm='astar', options=None, cache_size=1024, map_root='.', max_maps=64):
+        self.algorithm = algorithm
+        self.options = options or {}
+        self.cache = PathCache(cache_size) if cache_size > 0 else None
+        self.map_root = os.path.realpath(map_root)
+        self.max_maps = max_maps
+        self.maps = {}  # map id -> (grid, initial_state, goal_states)
+        self.lock = threading.Lock()  # the solvers share module-level caches, so one request at a time
+        self.queries = 0
+        self.errors = 0
+        self.started = time.time()
+
+    def load(self, map_id, file_path=None):
+        if not isinstance(map_id, str):
+            raise ValueError("a map id must be a string")
+        if map_id not in self.maps and len(self.maps) >= self.max_maps:
+            raise ValueError(f"already holding {self.max_maps} maps; unload one first")
+        file_path = os.path.realpath(os.path.join(self.map_root, file_path or map_id))
+        if os.path.commonpath([self.map_root, file_path]) != self.map_root:
+            raise ValueError(f"map files must be inside {self.map_root}")
+        grid, initial_state, goal_states = load_map(file_path)
+        self.maps[map_id] = (grid, initial_state, goal_states)
+        return {'map': map_id, 'rows': grid.num_rows, 'cols': grid.num_cols}
+
+    def get_map(self, map_id):
+        if map_id not in self.maps:
+            raise ValueError(f"Unknown map '{map_id}'; load it first")
+        return self.maps[map_id]
+
+    def solve(self, request):
+        map_id = request.get('map')
+        if map_id is None:
+            raise ValueError("a solve request needs a 'map'")
+        grid, initial_state, goal_states = self.get_map(map_id)
+        start = request.get('start', initial_state)
+        goals = request.get('goals', goal_states)
+        algorithm = request.get('algorithm', self.algorithm)
+        options = dict(self.options, **check_options(request.get('options', {})))
+        return answer_query(grid, start, goals, algorithm, options, request.get('include_path', True), self.cache,
+                            request.get('include_stats', False))
+
+    def stats(self):
+        return {
+            'queries': self.queries,
+            'errors': self.errors,
+            'maps': len(self.maps),
+            'uptime_s': round(time.time() - self.started, 3),
+            'distance_field_cache': {'hits': distance_field_cache.hits, 'misses': distance_field_cache.misses},
+            'component_cache': {'hits': component_cache.hits, 'misses': component_cache.misses},
+            'path_cache': self.cache.stats() if self.cache is not None else None,
+        }
+
+    # Function to answer one request dict with a response dict
+    def handle(self, request):
+        command = request.get('command', 'solve')
+        if command == 'solve':
+            return self.solve(request)
+        if command == 'load':
+            return self.load(request['map'], request.get('path'))
+        if command == 'unload':
+            return {'unloaded': self.maps.pop(request['map'], None) is not None}
+        if command == 'maps':
+            return {'maps': {map_id: [grid.num_rows, grid.num_cols] for map_id, (grid, _, _) in self.maps.items()}}
+        if command == 'stats':
+            return self.stats()
+        raise ValueError(f"Unknown command '{command}'")
+
+    # Function to answer one JSON line; errors are reported in the response, never raised
+    def handle_line(self, line):
+        response = {}
+        with self.lock:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("a request must be a JSON object")
+                if 'id' in request:
+                    response['id'] = request['id']
+                response.update(self.handle(request))
+            except KeyError as error:
+                response['error'] = f"missing field {error}"
+            except (ValueError, TypeError, OSError) as error:
+                response['error'] = str(error)
+            except Exception as error:  # a failing request must not take the service down
+                response['error'] = f"{type(error).__name__}: {error}"
+            self.queries += 1
+            self.errors += 'error' in response
+        return json.dumps(response)
+
+    # Function to serve JSON lines from one stream pair until it is closed
+    def serve_stream(self, reader, writer):
+        for line in reader:
+            line = line.strip()
+            if line:
+                writer.write(self.handle_line(line) + '\n')
+                writer.flush()
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        reader = io.TextIOWrapper(self.rfile, encoding='utf-8')
+        writer = io.TextIOWrapper(self.wfile, encoding='utf-8', write_through=True)
+        self.server.service.serve_stream(reader, writer)
+
+# Function to serve on a Unix domain socket until interrupted
+def serve_socket(service, socket_path):
+    if not hasattr(socketserver, 'ThreadingUnixStreamServer'):
+        raise OSError("Unix domain sockets are not available on this platform; use stdin mode")
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)  # left over from a previous run
+    with socketserver.ThreadingUnixStreamServer(socket_path, RequestHandler) as server:
+        server.daemon_threads = True
+        server.service = service
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))  # still remove the socket file
+        print(f"Listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+# Function for clients: send one request to a running daemon and return its response
+def query(socket_path, request):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile('r', encoding='utf-8') as reader:
+            return json.loads(reader.readline())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve solver queries as JSON lines.")
+    parser.add_argument('maps', nargs='*', help="map files to load at startup (their path is their id)")
+    parser.add_argument('--socket', metavar='PATH', help="listen on this Unix domain socket instead of stdin")
+    parser.add_argument('--algorithm', default='astar', choices=sorted(SOLVERS))
+    parser.add_argument('--depth-limit', type=int, default=None, help="depth limit for dls (default: rows*cols)")
+    parser.add_argument('--cache-size', type=int, default=1024, help="cached query results (0 turns the cache off)")
+    parser.add_argument('--map-root', default='.', help="directory that map files may be loaded from")
+    parser.add_argument('--max-maps', type=int, default=64, help="most maps held at once")
+    args = parser.parse_args(argv)
+
+    service = SolverService(args.algorithm, {'depth_limit': args.depth_limit}, args.cache_size,
+                            args.map_root, args.max_maps)
+    for algorithm in SOLVERS:
+        prepare_solver(algorithm)
+    for file_path in args.maps:
+        try:
+            service.load(file_path)
+        except (OSError, ValueError) as error:
+            print(f"Error: {error}", file=sys.stderr)
+            sys.exit(1)
+
+    if args.socket:
+        try:
+            serve_socket(service, args.socket)
+        except OSError as error:
+            print(f"Error: {error}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        service.serve_stream(sys.stdin, sys.stdout)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import os
+import importlib.util
+from search_stats import SearchStats
+
+# Common front end for the solver scripts, used by tools that answer many queries in one process.
+# Every adapter takes (grid, start, goal_states, options, stats), fills in the SearchStats and
+# returns (found, path), with path running from start to the reached goal inclusive.
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+loaded_scripts = {}
+
+# Function to import a solver script by file name (several are not valid module names, e.g. as.py)
+def load_script(file_name):
+    module = loaded_scripts.get(file_name)
+    if module is None:
+        name = 'solver_' + os.path.splitext(file_name)[0].replace('-', '_')
+        spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPT_DIR, file_name))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        loaded_scripts[file_name] = module
+    return module
+
+# Function to get the direction words for a path of unit steps
+def path_directions(path):
+    direction_map = {(0, -1): 'up', (0, 1): 'down', (-1, 0): 'left', (1, 0): 'right'}
+    return [direction_map.get((b[0] - a[0], b[1] - a[1]), 'unknown') for a, b in zip(path, path[1:])]
+
+def solve_astar_variant(search_name):
+    def solve(grid, start, goal_states, options, stats):
+        found, path, _ = getattr(load_script('as.py'), search_name)(grid, start, goal_states, options.get('trace'), stats=stats)
+        return found, path
+    return solve
+
+def solve_bfs(grid, start, goal_states, options, stats):
+    found, path, _, _ = load_script('bfs.py').bfs_search(grid, start, goal_states, options.get('trace'), stats)
+    return found, path
+
+def solve_dfs(grid, start, goal_states, options, stats):
+    found, path, _, _ = load_script('dfs.py').dfs(grid, start[0], start[1], set(goal_states), set(),
+                                                  trace=options.get('trace'), stats=stats)
+    return found, path if found else []
+
+def solve_dls(grid, start, goal_states, options, stats):
+    module = load_script('dls.py')
+    limit = options.get('depth_limit') or grid.num_rows * grid.num_cols
+    for goal in goal_states:
+        path = module.dls_console(grid, start, goal, limit, set(), [], options.get('trace'), stats)
+        if path:
+            return True, path
+    return False, []
+
+def solve_iddfs(grid, start, goal_states, options, stats):
+    path, _ = load_script('dls.py').iterative_deepening_search(
+        grid, start, goal_states, options.get('depth_limit'), trace=options.get('trace'), stats=stats)
+    return bool(path), path or []
+
+def solve_gbfs(grid, start, goal_states, options, stats):
+    found, path, _, _, _ = load_script('gbfs.py').greedy_best_first_search(
+        grid, start, set(goal_states), use_gui=False, trace=options.get('trace'), stats=stats)
+    return found, path
+
+def solve_bs(grid, start, goal_states, options, stats):
+    found, path, _ = load_script('bs.py').bidirectional_search_unified(
+        grid, start, goal_states, trace=options.get('trace'), stats=stats)
+    return found, path
+
+def solve_ida(grid, start, goal_states, options, stats):
+    path = load_script('ida-star.py').ida_star(grid, start, set(goal_states), False, options.get('trace'), stats=stats)
+    return bool(path), path
+
+SOLVERS = {
+    'astar': solve_astar_variant('a_star_search'),
+    'astar-field': solve_astar_variant('distance_field_search'),
+    'jps': solve_astar_variant('jps_search'),
+    'hpa': solve_astar_variant('hierarchical_search'),
+    'weighted': solve_astar_variant('weighted_search'),
+    'bfs': solve_bfs,
+    'dfs': solve_dfs,
+    'dls': solve_dls,
+    'iddfs': solve_iddfs,
+    'gbfs': solve_gbfs,
+    'bs': solve_bs,
+    'ida': solve_ida,
+}
+
+# Script behind each solver name, so callers can import it before timing any query
+SOLVER_SCRIPTS = {
+    'astar': 'as.py', 'astar-field': 'as.py', 'jps': 'as.py', 'hpa': 'as.py', 'weighted': 'as.py',
+    'bfs': 'bfs.py', 'dfs': 'dfs.py', 'dls': 'dls.py', 'iddfs': 'dls.py', 'gbfs': 'gbfs.py', 'bs': 'bs.py',
+    'ida': 'ida-star.py',
+}
+
+def check_algorithm(algorithm):
+    if algorithm not in SOLVERS:
+        raise ValueError(f"Unknown algorithm '{algorithm}', expected one of: {', '.join(SOLVERS)}")
+
+# Function to load a solver's script ahead of its first query
+def prepare_solver(algorithm):
+    check_algorithm(algorithm)
+    load_script(SOLVER_SCRIPTS[algorithm])
+
+# Function to empty the per-map caches the solvers share (component indexes, distance fields
+# and HPA* hierarchies), so the next query pays for building what it needs as on a new map
+def clear_caches():
+    from components import component_cache
+    from distance_field import distance_field_cache
+    from hierarchical import hierarchy_cache
+    component_cache.clear()
+    distance_field_cache.clear()
+    hierarchy_cache.clear()
+
+# Function to run one query with a named solver, returning (found, path, stats)
+def solve(algorithm, grid, start, goal_states, options=None):
+    check_algorithm(algorithm)
+    stats = SearchStats(algorithm)
+    with stats.phase('search'):
+        found, path = SOLVERS[algorithm](grid, start, goal_states, options or {}, stats)
+    return found, path, stats